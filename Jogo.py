@@ -9,22 +9,32 @@
 #- Partida: Gerencia uma partida individual do jogo, incluindo a lógica de atualização da grade, 
 #  remoção de linhas completas e pontuação.
 #- Tela: Responsável por exibir a interface do jogo no terminal e limpar a tela.
+#- Teclado: Lê as teclas digitadas sem bloquear, para que a partida as aplique em lote a cada quadro.
 #- Jogo: Gerencia o fluxo principal do jogo, incluindo o menu principal, iniciar novas partidas 
 #  e carregar partidas salvas.
 #
 #Constantes:
 #- TETROMINOES: Define as formas das peças do jogo em termos de coordenadas relativas.
+#- FORMAS, SIMBOLOS, ROTACOES: Tabelas indexadas pelo código da peça (e pela rotação), usadas
+#  por Peca para guardar apenas inteiros.
 #
 #Dependências:
-#- readchar: Biblioteca usada para detectar entradas de teclado de forma interativa.
+#- readchar: Biblioteca usada para detectar entradas de teclado de forma interativa. É importada
+#  apenas quando uma partida é jogada no terminal (classe Teclado), de modo que as regras do jogo
+#  (Peca, Partida, Ranking) podem ser usadas sem terminal e sem essa biblioteca instalada.
 #- os: Usada para limpar a tela do terminal dependendo do sistema operacional.
 #- random: Utilizada para selecionar peças aleatórias.
 #- datetime: Utilizada para manipular datas e horários
+#- bisect: Utilizada nas consultas ao índice ordenado do ranking.
+#- time: Utilizada para limitar a taxa de quadros da partida no terminal.
+#- select, termios, tty (msvcrt no Windows), re, sys: Usadas para ler o teclado sem bloquear
+#  (importadas junto com readchar).
 
+import bisect
 import os
 import random
-from readchar import readkey, key
 import datetime
+import time
 
 
 ## Constante Tetrominoes
@@ -39,52 +49,137 @@ TETROMINOES = {
     'Z': [(0, 0), (0, 1), (1, 1), (1, 2)]
 }
 
+## Formas das peças, na ordem dos códigos de peça (Peca.codigo)
+FORMAS = tuple(TETROMINOES)
+
+## Símbolo de cada forma, indexado pelo código de peça
+SIMBOLOS = ('$', '&', '+', '#', '*', '%', '@')
+
+## Calcula as coordenadas de uma forma nas quatro rotações.
+#  Cada rotação no sentido horário leva (dx, dy) em (-dy, dx).
+#  @param coordenadas Coordenadas relativas da forma sem rotação.
+#  @return Tupla com as coordenadas das rotações 0 a 3.
+def _rotacoes(coordenadas):
+    rotacoes = [tuple(coordenadas)]
+    for _ in range(3):
+        rotacoes.append(tuple((-dy, dx) for dx, dy in rotacoes[-1]))
+    return tuple(rotacoes)
+
+## Coordenadas de cada forma nas quatro rotações, indexadas por [código][rotação]
+ROTACOES = tuple(_rotacoes(TETROMINOES[forma]) for forma in FORMAS)
+
+## Código da célula vazia na grade compacta. A peça de código c ocupa células de código c + 1.
+CODIGO_VAZIO = 0
+
+## Tabelas de tradução entre os códigos da grade compacta e os símbolos exibidos
+_CODIGOS_PARA_SIMBOLOS = bytes.maketrans(bytes(range(len(SIMBOLOS) + 1)), (" " + "".join(SIMBOLOS)).encode("ascii"))
+_SIMBOLOS_PARA_CODIGOS = bytes.maketrans((" " + "".join(SIMBOLOS)).encode("ascii"), bytes(range(len(SIMBOLOS) + 1)))
+
+
+## Converte uma linha da grade (de texto ou compacta) no texto exibido e salvo.
+#  @param linha Lista de caracteres ou `bytearray` de códigos de célula.
+#  @return String com os símbolos da linha.
+def textoLinha(linha):
+    if linha.__class__ is bytearray:
+        return linha.translate(_CODIGOS_PARA_SIMBOLOS).decode("ascii")
+    return "".join(linha)
+
+
+## Converte uma linha de texto da grade em uma linha da grade compacta.
+#  @param linha String ou lista de caracteres com os símbolos da linha.
+#  @return `bytearray` de códigos de célula.
+def linhaCompacta(linha):
+    return bytearray("".join(linha).encode("ascii").translate(_SIMBOLOS_PARA_CODIGOS))
+
+## Comandos da partida
+# Comandos aplicados à peça atual, independentes do teclado. São usados tanto pelo
+# jogo interativo quanto por partidas sem terminal (autojogador e afinador).
+BAIXO = 'baixo'
+DIREITA = 'direita'
+ESQUERDA = 'esquerda'
+GIRAR_HORARIO = 'girar_horario'
+GIRAR_ANTI_HORARIO = 'girar_anti_horario'
+
+## Taxa máxima de quadros por segundo da partida no terminal
+FPS_MAXIMO = 30
+
+## Eventos da partida
+# Tipos de evento emitidos por Partida para os seus observadores.
+NOVA_PECA = 'nova_peca'
+MOVIMENTO = 'movimento'
+ROTACAO = 'rotacao'
+FIXACAO = 'fixacao'
+LINHAS_REMOVIDAS = 'linhas_removidas'
+PONTUACAO = 'pontuacao'
+SALVAMENTO = 'salvamento'
+FIM_DE_JOGO = 'fim_de_jogo'
+
+## Campos de cada evento, na ordem usada pelos gravadores (ver módulo eventos)
+CAMPOS_EVENTO = ('sequencia', 'jogador', 'tipo', 'forma', 'x', 'y', 'linhas', 'pontuacao')
+
 
 ## @class Peca
 #  @brief Representa uma peça Tetromino no jogo, com funcionalidades para posicionamento, movimento e rotação.
+#
+#  A peça guarda apenas inteiros: o código da forma (índice em FORMAS), a rotação atual
+#  (índice em ROTACOES) e a posição. A forma, o símbolo e as coordenadas são obtidos das
+#  tabelas do módulo. A peça funciona tanto na grade de texto (listas de caracteres)
+#  quanto na grade compacta (linhas `bytearray` com códigos de célula, ver Partida).
 class Peca:
+    __slots__ = ('codigo', 'rotacao', 'x', 'y')
+
     ## @brief Construtor da classe Peca.
     #  Inicializa uma peça com forma e símbolo aleatórios. A peça começa no topo central da grade.
     #  @param colunas Número de colunas na grade do jogo.
-    def __init__(self, colunas):
-        ## Forma do tetromino
-        self.forma = random.choice(list(TETROMINOES.keys()))
-
-        if self.forma == 'I':
-            ## Símbolo usado para a forma em questão
-            self.simbolo = '$'
-        elif self.forma == 'O':
-            self.simbolo = '&'
-        elif self.forma == 'T':
-            self.simbolo = '+'
-        elif self.forma == 'L':
-            self.simbolo = '#'
-        elif self.forma == 'J':
-            self.simbolo = '*'
-        elif self.forma == 'S':
-            self.simbolo = '%'
-        else:
-            self.simbolo = '@'
-        
+    #  @param gerador Gerador de números aleatórios usado para sortear a forma (padrão: módulo random).
+    def __init__(self, colunas, gerador=random):
+        ## Código da forma do tetromino (índice em FORMAS)
+        self.codigo = gerador.randrange(len(FORMAS))
+        ## Rotação atual da peça (índice em ROTACOES[codigo])
+        self.rotacao = 0
         ## Coordenada horizontal inicial da peça
         self.x = int (colunas/2)
         ## Coordenada vertical inicial da peça
         self.y = 0
-    
+
+    ## Forma do tetromino ('I', 'O', 'T', 'L', 'J', 'S' ou 'Z')
+    @property
+    def forma(self):
+        return FORMAS[self.codigo]
+
+    ## Símbolo usado para a forma em questão
+    @property
+    def simbolo(self):
+        return SIMBOLOS[self.codigo]
+
+    ## Coordenadas relativas da peça na orientação atual
+    @property
+    def coordenadas(self):
+        return ROTACOES[self.codigo][self.rotacao]
+
+    ## @brief Retorna o valor de célula vazia e a marca da peça para o tipo de grade.
+    #  @param tabuleiro Grade de texto ou grade compacta.
+    #  @return Tupla (vazio, marca).
+    def _celulas(self, tabuleiro):
+        if tabuleiro[0].__class__ is bytearray:
+            return CODIGO_VAZIO, self.codigo + 1
+        return ' ', SIMBOLOS[self.codigo]
+
     ## @brief Posiciona a peça na grade do tabuleiro.
     #  @param tabuleiro Matriz representando a grade do jogo.
     #  @return True se o posicionamento for bem-sucedido, False caso contrário.
     def posicionarTabuleiro(self, tabuleiro):
-        coord = TETROMINOES[self.forma] 
+        vazio, marca = self._celulas(tabuleiro)
+        coord = ROTACOES[self.codigo][self.rotacao]
         for dx, dy in coord:
             x_pos = self.x + dx
             y_pos = self.y + dy
-            if tabuleiro[y_pos][x_pos] != ' ':
+            if tabuleiro[y_pos][x_pos] != vazio:
                 return False
         for dx, dy in coord:
             x_pos = self.x + dx
             y_pos = self.y + dy
-            tabuleiro[y_pos][x_pos] = self.simbolo
+            tabuleiro[y_pos][x_pos] = marca
         return True
 
     ## @brief Move a peça no tabuleiro na direção especificada.
@@ -101,11 +196,12 @@ class Peca:
     #  Substitui as posições ocupadas pela peça por espaços vazios.
     #  @param tabuleiro Matriz representando o tabuleiro.
     def apagaAnterior(self, tabuleiro):
-        coord = TETROMINOES[self.forma] 
+        vazio, _ = self._celulas(tabuleiro)
+        coord = ROTACOES[self.codigo][self.rotacao]
         for dx, dy in coord:
             x_pos = self.x + dx
             y_pos = self.y + dy
-            tabuleiro[y_pos][x_pos] = ' ' 
+            tabuleiro[y_pos][x_pos] = vazio
     
     ## @brief Verifica se a peça pode se mover para uma nova posição.
     #  @param tabuleiro Matriz representando o tabuleiro.
@@ -113,8 +209,8 @@ class Peca:
     #  @param dy Deslocamento na direção vertical.
     #  @return True se o movimento for válido, False caso contrário.
     def podeMover(self, tabuleiro, dx, dy):
-    
-        coord_atual = TETROMINOES[self.forma]
+        vazio, _ = self._celulas(tabuleiro)
+        coord_atual = ROTACOES[self.codigo][self.rotacao]
 
         for dx_, dy_ in coord_atual:
             x_pos = self.x + dx + dx_
@@ -126,7 +222,7 @@ class Peca:
             if y_pos < 0:
                 continue
 
-            if tabuleiro[y_pos][x_pos] != ' ':
+            if tabuleiro[y_pos][x_pos] != vazio:
                 if (x_pos, y_pos) not in [(self.x + dx_, self.y + dy_) for dx_, dy_ in coord_atual]:
                     return False
 
@@ -136,19 +232,14 @@ class Peca:
     #  @param tabuleiro Matriz representando o tabuleiro.
     #  @param sentido_horario Se True, rotaciona no sentido horário; caso contrário, rotaciona no sentido anti-horário.
     def rotacionar(self, tabuleiro, sentido_horario=True):
-        ## Forma da peça vigente
-        forma = self.forma
-        if forma == 'O':  
+        if FORMAS[self.codigo] == 'O':
             return
 
-        novas_coordenadas = []
-        for dx, dy in TETROMINOES[self.forma]:
-            if sentido_horario:
-                novas_coordenadas.append((-dy, dx))  
-            else:
-                novas_coordenadas.append((dy, -dx))  
+        vazio, _ = self._celulas(tabuleiro)
+        nova_rotacao = (self.rotacao + (1 if sentido_horario else -1)) % 4
+        novas_coordenadas = ROTACOES[self.codigo][nova_rotacao]
 
-        backup = novas_coordenadas
+        ocupadas = [(self.x + dx, self.y + dy) for dx, dy in ROTACOES[self.codigo][self.rotacao]]
         for dx, dy in novas_coordenadas:
             x_pos = self.x + dx
             y_pos = self.y + dy
@@ -156,14 +247,12 @@ class Peca:
             if x_pos < 0 or x_pos >= len(tabuleiro[0]) or y_pos < 0 or y_pos >= len(tabuleiro):
                 return  
 
-            if tabuleiro[y_pos][x_pos] != ' ':
+            if tabuleiro[y_pos][x_pos] != vazio and (x_pos, y_pos) not in ocupadas:
                 return  
 
-            self.apagaAnterior(tabuleiro)
-
-            TETROMINOES[self.forma] = novas_coordenadas
-            self.posicionarTabuleiro(tabuleiro)
-            TETROMINOES[self.forma] = backup
+        self.apagaAnterior(tabuleiro)
+        self.rotacao = nova_rotacao
+        self.posicionarTabuleiro(tabuleiro)
 
 
 ## @package partida
@@ -183,10 +272,20 @@ class Partida:
     #  @param jogador Nome do jogador.
     #  @param mapa Estado inicial da grade (None para nova partida).
     #  @param pontuacao Pontuação inicial (None para iniciar com 0).
-    def __init__(self, linhas, colunas, jogador, mapa, pontuacao):
+    #  @param semente Semente do sorteio das peças (None para uma sequência imprevisível).
+    #  @param compacta Se True, cada linha da grade é um `bytearray` de códigos de célula
+    #  (CODIGO_VAZIO ou código da peça + 1), em vez de uma lista de caracteres. Usada em
+    #  partidas sem terminal, para reduzir a memória; a exibição e o arquivo salvo não mudam.
+    def __init__(self, linhas, colunas, jogador, mapa, pontuacao, semente=None, compacta=False):
+        ## Indica se a grade é compacta
+        self.compacta = compacta
+        ## Valor da célula vazia na grade
+        self.vazio = CODIGO_VAZIO if compacta else " "
         if mapa == None:
             ## Grade da nova partida ou de partida pré-carregada
-            self.grade = [[" " for _ in range(colunas)] for _ in range(linhas)]
+            self.grade = [self._novaLinha(colunas) for _ in range(linhas)]
+        elif compacta:
+            self.grade = [linhaCompacta(linha) for linha in mapa]
         else:
             self.grade = mapa
         ## Número de linhas da grade
@@ -195,8 +294,10 @@ class Partida:
         self.colunas = colunas
         ## Nome do jogador da partida
         self.jogador = jogador
+        ## Gerador usado para sortear as peças da partida (o módulo random, se não houver semente)
+        self.gerador = random if semente is None else random.Random(semente)
         ## Peça atual que o jogador controla
-        self.peca_atual = Peca(colunas)
+        self.peca_atual = Peca(colunas, self.gerador)
         ## Estado do jogo
         self.jogo_ativo = True
         if pontuacao == None:
@@ -204,58 +305,166 @@ class Partida:
             self.pontuacao = 0
         else:
             self.pontuacao = pontuacao
+        ## Funções chamadas com cada evento da partida (ver _emitir)
+        self.observadores = []
+        ## Número de eventos emitidos na partida
+        self.sequencia_eventos = 0
 
     ## Inicia o loop principal do jogo.
     #
     #  O jogo continua até que o jogador encerre manualmente ou uma condição
     #  de Game Over seja atingida.
+    #
+    #  A cada quadro, todas as teclas pendentes são aplicadas em lote e a tela é
+    #  redesenhada uma única vez, no máximo `fps_maximo` vezes por segundo. Assim,
+    #  rajadas de repetição de tecla não atrasam a exibição em relação à entrada.
     #  @param self O objeto da classe.
+    #  @param fps_maximo Número máximo de quadros exibidos por segundo.
+    #  @param teclado Fonte das teclas (padrão: o teclado do terminal, ver Teclado).
+    #  @param autosalvamento Salvamento automático da partida (ver módulo autosalvamento), ou None.
+    #  Os arquivos do salvamento automático são apagados apenas no Game Over e quando a
+    #  partida é gravada com <g>; se o jogador sair com <s> ou a partida for interrompida
+    #  (Ctrl+C ou erro), eles são mantidos para que a partida possa ser retomada.
     #  @return Pontuação final do jogador.
-    def jogar(self):
-        while self.jogo_ativo:
-            Tela.limpar_tela()  
+    def jogar(self, fps_maximo=FPS_MAXIMO, teclado=None, autosalvamento=None):
+        if teclado is None:
+            teclado = Teclado()
+        intervalo = 1 / fps_maximo
+        remover_autosalvamento = False
+
+        self.posicionarPecaAtual()
+        teclado.iniciar()
+        try:
+            Tela.limpar_tela()
+            Tela.exibir(self.grade, self.pontuacao)
+            ultimo_quadro = time.monotonic()
+
+            while self.jogo_ativo:
+                lote = [teclado.ler()]
+                espera = ultimo_quadro + intervalo - time.monotonic()
+                if espera > 0:
+                    time.sleep(espera)
+                lote += teclado.pendentes()
+
+                for tecla in lote:
+                    if tecla == 's':
+                        return self.pontuacao
+                    elif tecla == 'g':
+                        self.peca_atual.apagaAnterior(self.grade)
+                        self.salvar_jogo()
+                        remover_autosalvamento = True
+                        return self.pontuacao
+                    elif tecla in teclado.comandos:
+                        self.aplicarComando(teclado.comandos[tecla])
+                        if not self.jogo_ativo:
+                            break
 
-            if not self.peca_atual.posicionarTabuleiro(self.grade):
-                self.jogo_ativo = False
                 Tela.limpar_tela()
                 Tela.exibir(self.grade, self.pontuacao)
-                print("Game Over!")
-                return self.pontuacao
+                ultimo_quadro = time.monotonic()
+                if autosalvamento is not None and self.jogo_ativo:
+                    autosalvamento.registrar(self)
+
+            print("Game Over!")
+            remover_autosalvamento = True
+            return self.pontuacao
+        finally:
+            teclado.parar()
+            if autosalvamento is not None:
+                if not remover_autosalvamento:
+                    autosalvamento.registrar(self, forcar=True)
+                autosalvamento.encerrar(remover=remover_autosalvamento)
+
+    ## Coloca a peça atual na grade.
+    #
+    #  Se não houver espaço para a peça, a partida é encerrada (Game Over).
+    #  @param self O objeto da classe.
+    #  @return True se a peça foi posicionada, False caso contrário.
+    def posicionarPecaAtual(self):
+        if not self.peca_atual.posicionarTabuleiro(self.grade):
+            self.jogo_ativo = False
+            self._emitir(FIM_DE_JOGO)
+        else:
+            self._emitir(NOVA_PECA)
+        return self.jogo_ativo
 
-            Tela.exibir(self.grade, self.pontuacao)
+    ## Aplica um comando à peça atual, sem depender do terminal.
+    #
+    #  Depois do comando, se a peça não puder mais descer ela é fixada na grade,
+    #  as linhas completas são removidas e uma nova peça entra em jogo.
+    #  @param self O objeto da classe.
+    #  @param comando Um dos comandos BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO ou GIRAR_ANTI_HORARIO.
+    #  @return Número de linhas removidas se a peça foi fixada, None caso contrário.
+    def aplicarComando(self, comando):
+        peca = self.peca_atual
+        if comando == BAIXO:
+            if peca.podeMover(self.grade, 0, 1):
+                peca.moverPeca(self.grade, 0, 1)
+                self._emitir(MOVIMENTO)
+        elif comando == DIREITA:
+            if peca.podeMover(self.grade, 1, 0):
+                peca.moverPeca(self.grade, 1, 0)
+                self._emitir(MOVIMENTO)
+        elif comando == ESQUERDA:
+            if peca.podeMover(self.grade, -1, 0):
+                peca.moverPeca(self.grade, -1, 0)
+                self._emitir(MOVIMENTO)
+        elif comando == GIRAR_HORARIO or comando == GIRAR_ANTI_HORARIO:
+            rotacao = peca.rotacao
+            peca.rotacionar(self.grade, sentido_horario=(comando == GIRAR_HORARIO))
+            if peca.rotacao != rotacao:
+                self._emitir(ROTACAO)
+        else:
+            raise ValueError(f"Comando inválido: {comando}")
 
-            while self.peca_atual.podeMover(self.grade, 0, 1):
-                tecla = readkey() 
-                if tecla == 's':
-                    return self.pontuacao
-                elif tecla == key.DOWN:
-                    if self.peca_atual.podeMover(self.grade, 0, 1):
-                        self.peca_atual.moverPeca(self.grade, 0, 1)
-                elif tecla == key.RIGHT:
-                    if self.peca_atual.podeMover(self.grade, 1, 0):
-                        self.peca_atual.moverPeca(self.grade, 1, 0)
-                elif tecla == key.LEFT:
-                    if self.peca_atual.podeMover(self.grade, -1, 0):
-                        self.peca_atual.moverPeca(self.grade, -1, 0)
-                elif tecla == key.PAGE_UP:
-                    self.peca_atual.rotacionar(self.grade, sentido_horario=True)
-                elif tecla == key.PAGE_DOWN:
-                    self.peca_atual.rotacionar(self.grade, sentido_horario=False)
-                elif tecla == 'g':
-                    self.peca_atual.apagaAnterior(self.grade)
-                    self.salvar_jogo()
-                    return self.pontuacao
-                else:
-                    continue
-                Tela.limpar_tela()
-                Tela.exibir(self.grade, self.pontuacao)
+        if not peca.podeMover(self.grade, 0, 1):
+            return self.fixarPeca()
+        return None
+
+    ## Fixa a peça atual na grade e sorteia a próxima.
+    #
+    #  Remove as linhas completas, soma 100 pontos por linha removida e posiciona
+    #  a nova peça no topo da grade.
+    #  @param self O objeto da classe.
+    #  @return Número de linhas removidas.
+    def fixarPeca(self):
+        self.peca_atual.posicionarTabuleiro(self.grade)
+        self._emitir(FIXACAO)
+        linhas_removidas = self.removerLinhas()
+        if linhas_removidas:
+            self._emitir(LINHAS_REMOVIDAS, linhas_removidas)
+            self.pontuacao += linhas_removidas * 100
+            self._emitir(PONTUACAO)
+        self.peca_atual = Peca(self.colunas, self.gerador)
+        self.posicionarPecaAtual()
+        return linhas_removidas
+
+    ## Envia um evento aos observadores da partida.
+    #
+    #  O evento é um dicionário com os campos de CAMPOS_EVENTO, descrevendo a peça
+    #  atual e a pontuação no momento do evento. A partida não guarda os eventos:
+    #  cada observador decide o que fazer com eles (ver módulo eventos).
+    #  @param self O objeto da classe.
+    #  @param tipo Tipo do evento (NOVA_PECA, MOVIMENTO, ROTACAO, ...).
+    #  @param linhas Número de linhas removidas (apenas em LINHAS_REMOVIDAS).
+    def _emitir(self, tipo, linhas=None):
+        self.sequencia_eventos += 1
+        if not self.observadores:
+            return
+        peca = self.peca_atual
+        evento = {
+            'sequencia': self.sequencia_eventos,
+            'jogador': self.jogador,
+            'tipo': tipo,
+            'forma': peca.forma,
+            'x': peca.x,
+            'y': peca.y,
+            'linhas': linhas,
+            'pontuacao': self.pontuacao,
+        }
+        for observador in self.observadores:
+            observador(evento)
 
-                if not self.peca_atual.podeMover(self.grade, 0, 1):
-                    self.peca_atual.posicionarTabuleiro(self.grade)
-                    linhas_removidas = self.removerLinhas()
-                    self.pontuacao += linhas_removidas * 100
-                    self.peca_atual = Peca(self.colunas)
-    
     ## Remove linhas completas do tabuleiro.
     #
     #  Filtra as linhas do tabuleiro para manter apenas as que contêm espaços vazios.
@@ -264,11 +473,20 @@ class Partida:
     #  @return Número de linhas removidas.
     def removerLinhas(self):
 
-        novas_linhas = [linha for linha in self.grade if " " in linha]
+        novas_linhas = [linha for linha in self.grade if self.vazio in linha]
         linhas_removidas = len(self.grade) - len(novas_linhas)
-        self.grade = [[" " for _ in range(self.colunas)] for _ in range(linhas_removidas)] + novas_linhas
+        self.grade = [self._novaLinha(self.colunas) for _ in range(linhas_removidas)] + novas_linhas
         return linhas_removidas 
 
+    ## Cria uma linha vazia da grade, no formato da partida (de texto ou compacta).
+    #  @param self O objeto da classe.
+    #  @param colunas Número de colunas da linha.
+    #  @return Lista de espaços ou `bytearray` de CODIGO_VAZIO.
+    def _novaLinha(self, colunas):
+        if self.compacta:
+            return bytearray(colunas)
+        return [" " for _ in range(colunas)]
+
     ## Salva o estado atual do jogo em um arquivo.
     #
     #  O arquivo de salvamento inclui as dimensões do tabuleiro, o nome do jogador,
@@ -286,10 +504,26 @@ class Partida:
             f.write(f"{self.pontuacao}\n")  
 
             for linha in self.grade:
-                f.write("".join(linha) + "\n")
-    
+                f.write(textoLinha(linha) + "\n")
+
+        self._emitir(SALVAMENTO)
         print(f"Jogo salvo em: {nome_arquivo}")
 
+    ## Exporta o estado da partida em buffers contíguos, atualizados a cada evento.
+    #
+    #  A grade é exposta como memoryview (linhas, colunas) sobre um bytearray, um byte
+    #  por célula, e a peça, a rotação e a pontuação em um buffer de inteiros
+    #  (ver módulo observacao). Os buffers são alocados uma única vez.
+    #  @param self O objeto da classe.
+    #  @return Objeto Observacao da partida.
+    def observacao(self):
+        from observacao import Observacao
+
+        for observador in self.observadores:
+            if observador.__class__ is Observacao:
+                return observador
+        return Observacao(self)
+
 
 ## @package tela
 #  Módulo utilitário para exibir e atualizar a interface do jogo no terminal.
@@ -307,22 +541,130 @@ class Tela:
     def limpar_tela():
         os.system('cls||clear')
 
+    ## Desenha a moldura da grade em volta das linhas de texto dadas.
+    #  @param linhas Lista de strings de mesmo tamanho, uma por linha da grade.
+    #  @return Lista de strings: borda superior, linhas entre "|" e borda inferior.
+    @staticmethod
+    def moldura(linhas):
+        borda = "—" * (len(linhas[0]) + 2)
+        return [borda] + ["|" + linha + "|" for linha in linhas] + [borda]
+
     ## Exibe a grade do jogo no terminal junto com a pontuação.
     #
     #  Desenha a grade com bordas, mostra a pontuação atual e exibe os comandos disponíveis.
+    #  O quadro inteiro é montado antes e escrito de uma só vez.
     #  @param grade Matriz representando a grade do jogo.
     #  @param pontuacao Pontuação atual do jogador.
     @staticmethod
     def exibir(grade, pontuacao):
-        print("—" * (len(grade[0]) + 2))
-        for linha in grade:
-            print("|" + "".join(linha) + "|")
-        print("—" * (len(grade[0]) + 2))
-        print(f"Pontuação: {pontuacao}")
-        print("\nComandos: ←, →, ↓, s (sair)")
-        print("<Page Down> rotaciona esquerda | <Page Up> rotaciona direita")
-        print("<s> sai da partida, <g> grava e sai da partida")
-        
+        quadro = Tela.moldura([textoLinha(linha) for linha in grade])
+        quadro.append(f"Pontuação: {pontuacao}")
+        quadro.append("\nComandos: ←, →, ↓, s (sair)")
+        quadro.append("<Page Down> rotaciona esquerda | <Page Up> rotaciona direita")
+        quadro.append("<s> sai da partida, <g> grava e sai da partida")
+        print("\n".join(quadro))
+
+
+## Classe que lê o teclado do terminal sem bloquear o loop da partida.
+#
+#  Enquanto a leitura está ativa, o terminal fica em modo cbreak (sem eco e sem esperar
+#  Enter) e o próprio loop da partida consulta a entrada com select, lendo de uma vez
+#  todas as teclas já digitadas. Uma sequência de escape cortada no fim de uma leitura
+#  fica guardada e é completada pela leitura seguinte. Como não há leitura pendente quando a partida termina,
+#  o menu volta a receber a entrada normalmente. No Windows, a consulta usa msvcrt.
+class Teclado:
+    ## Construtor da classe Teclado.
+    #
+    #  Importa a biblioteca readchar (códigos das teclas e leitura no Windows) e os módulos
+    #  de acesso ao terminal do sistema.
+    def __init__(self):
+        import codecs
+        import re
+        import sys
+        from readchar import readkey, key
+
+        ## Comando da partida associado a cada tecla
+        self.comandos = {
+            key.DOWN: BAIXO,
+            key.RIGHT: DIREITA,
+            key.LEFT: ESQUERDA,
+            key.PAGE_UP: GIRAR_HORARIO,
+            key.PAGE_DOWN: GIRAR_ANTI_HORARIO,
+        }
+        self._readkey = readkey
+        self._teclas = []
+        self._modo = None
+        self._windows = os.name == 'nt'
+        if self._windows:
+            import msvcrt
+            self._msvcrt = msvcrt
+        else:
+            import select
+            import termios
+            import tty
+            self._select = select.select
+            self._termios = termios
+            self._tty = tty
+            self._descritor = sys.stdin.fileno()
+            self._decodificador = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+            self._resto = ""
+            # Uma tecla é um caractere ou uma sequência de escape completa (ex.: "\x1b[B").
+            self._sequencia = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|O.|.)?|.", re.DOTALL)
+            # Início de uma sequência de escape ainda não terminada, no fim do texto lido
+            self._incompleta = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|O)?\Z")
+
+    ## Ativa a leitura do teclado, colocando o terminal em modo cbreak.
+    def iniciar(self):
+        if not self._windows:
+            self._modo = self._termios.tcgetattr(self._descritor)
+            self._tty.setcbreak(self._descritor)
+
+    ## Desativa a leitura do teclado, descarta as teclas não lidas e restaura o terminal.
+    def parar(self):
+        self._teclas = []
+        if self._windows:
+            while self._msvcrt.kbhit():
+                self._msvcrt.getwch()
+        elif self._modo is not None:
+            self._termios.tcsetattr(self._descritor, self._termios.TCSAFLUSH, self._modo)
+            self._modo = None
+            self._decodificador.reset()
+            self._resto = ""
+
+    ## Lê as teclas disponíveis na entrada.
+    #  @param espera Tempo máximo, em segundos, de espera pela primeira tecla (None: sem limite).
+    def _receber(self, espera):
+        if self._windows:
+            if espera is None or self._msvcrt.kbhit():
+                self._teclas.append(self._readkey())
+            while self._msvcrt.kbhit():
+                self._teclas.append(self._readkey())
+            return
+        while self._select([self._descritor], [], [], espera)[0]:
+            dados = os.read(self._descritor, 1024)
+            if not dados:
+                raise EOFError("Fim da entrada do teclado.")
+            texto = self._resto + self._decodificador.decode(dados)
+            incompleta = self._incompleta.search(texto)
+            corte = incompleta.start() if incompleta else len(texto)
+            self._teclas += self._sequencia.findall(texto[:corte])
+            self._resto = texto[corte:]
+            espera = 0
+
+    ## Espera a próxima tecla.
+    #  @return A tecla lida.
+    def ler(self):
+        while not self._teclas:
+            self._receber(None)
+        return self._teclas.pop(0)
+
+    ## Retorna todas as teclas já digitadas, sem esperar.
+    #  @return Lista de teclas, na ordem em que foram digitadas.
+    def pendentes(self):
+        self._receber(0)
+        teclas, self._teclas = self._teclas, []
+        return teclas
+
 
 ## @package jogo
 #  Módulo para gerenciar o fluxo principal do jogo, incluindo menu e ranking.
@@ -384,15 +726,27 @@ class Jogo:
 
         partida = Partida(linhas, colunas, jogador.nome, None, None)
 
-        jogador.pontuacao = partida.jogar()
+        jogador.pontuacao = partida.jogar(autosalvamento=self.autosalvamento(jogador.nome))
 
         self.ranking.adicionar(jogador.nome, jogador.pontuacao)
         self.ranking.salvar()
 
+    ## Cria o salvamento automático da partida de um jogador.
+    #
+    #  A partida é gravada em segundo plano no arquivo '<jogador>_autosave.txt', que pode
+    #  ser carregado com a opção <c> do menu, como qualquer partida gravada.
+    #  @param nome_jogador Nome do jogador.
+    #  @return Objeto AutoSalvamento.
+    def autosalvamento(self, nome_jogador):
+        from autosalvamento import AutoSalvamento
+
+        return AutoSalvamento(f"{nome_jogador}_autosave.txt")
+
     ## Carrega o estado de uma partida salva a partir de um arquivo.
     #
     #  O método restaura as dimensões do tabuleiro, nome do jogador, pontuação
-    #  e o estado do tabuleiro a partir de um arquivo salvo.
+    #  e o estado do tabuleiro a partir de um arquivo salvo. Se houver um registro
+    #  de deltas do salvamento automático, ele é aplicado sobre o estado lido.
     #
     #  @param nome_arquivo Nome do arquivo onde a partida foi salva.
     def carregarPartida(self, nome_arquivo):
@@ -411,11 +765,14 @@ class Jogo:
                     for char in linha:  
                         nova_linha.append(char)
                     grade.append(nova_linha)  
+
+            from autosalvamento import aplicarDeltas
+            jogador.pontuacao = aplicarDeltas(nome_arquivo, grade, jogador.pontuacao)
         except FileNotFoundError:
             print("Nenhuma partida salva encontrada.")
         
         partida = Partida(linhas, colunas, jogador.nome, grade, jogador.pontuacao)
-        jogador.pontuacao = partida.jogar()
+        jogador.pontuacao = partida.jogar(autosalvamento=self.autosalvamento(jogador.nome))
         self.ranking.adicionar(jogador.nome, jogador.pontuacao)
         self.ranking.salvar()
 
@@ -452,7 +809,20 @@ class Jogador:
 #
 #  A classe `Ranking` gerencia as pontuações dos jogadores, armazenando as pontuações em um arquivo e
 #  permitindo que o ranking seja exibido, salvo e carregado.
-
+#
+#  Todo o histórico de pontuações é mantido. Além da lista na ordem em que as pontuações
+#  foram registradas, o ranking guarda dois índices:
+#  - por pontuação: lista ordenada de chaves (-pontuação, ordem de registro, nome), consultada
+#    com busca binária (bisect) para obter a posição e o percentil de uma pontuação e as
+#    páginas do placar;
+#  - por jogador: a melhor pontuação e a lista de pontuações de cada jogador.
+#
+#  Ao carregar o arquivo, o índice por pontuação é montado de uma vez e ordenado uma
+#  única vez (O(n log n)). Cada pontuação adicionada depois é inserida com bisect.insort,
+#  que encontra a posição em O(log n) mas desloca os elementos seguintes da lista, O(n)
+#  por inserção; como uma partida registra uma única pontuação, esse custo é aceitável.
+#
+#  Em caso de empate, a pontuação registrada primeiro fica à frente no placar.
 class Ranking:
     ## Construtor da classe Ranking.
     #
@@ -460,12 +830,31 @@ class Ranking:
     #
     #  @param caminho_arquivo (str): Caminho do arquivo onde o ranking é armazenado. O valor padrão é 'ranking.txt'.
     def __init__(self, caminho_arquivo='ranking.txt'):
-        ## Pontuações do ranking
-        self.pontuacoes = self.carregar(caminho_arquivo)
+        ## Caminho do arquivo do ranking
+        self.caminho_arquivo = caminho_arquivo
+        ## Histórico de pontuações (nome, pontuação), na ordem de registro
+        self.historico = []
+        ## Índice por pontuação: chaves (-pontuação, ordem de registro, nome) em ordem crescente
+        self.ordenadas = []
+        ## Melhor pontuação de cada jogador
+        self.melhores = {}
+        ## Pontuações de cada jogador, na ordem de registro
+        self.por_jogador = {}
+        for nome, pontuacao in self.carregar(caminho_arquivo):
+            self.ordenadas.append(self._registrar(nome, pontuacao))
+        self.ordenadas.sort()
+        self._salvas = len(self.historico)
+
+    ## Pontuações do ranking (nome, pontuação), em ordem decrescente de pontuação.
+    #
+    #  Monta a lista inteira; para consultas, prefira pagina, posicao e percentil.
+    @property
+    def pontuacoes(self):
+        return [(nome, -negativa) for negativa, _, nome in self.ordenadas]
 
     ## Adiciona nova pontuação ao ranking.
     #
-    #  Adiciona uma nova pontuação ao ranking e ordena as pontuações em ordem decrescente.
+    #  Adiciona uma nova pontuação ao histórico e aos índices do ranking.
     #
     #  @param nome (str): Nome do jogador.
     #  @param pontuacao (int): Pontuação do jogador. Deve ser um número inteiro.
@@ -473,24 +862,76 @@ class Ranking:
         if not isinstance(pontuacao, int):
             raise ValueError(f"Pontuação inválida: {pontuacao}. Deve ser um inteiro.")
 
-        ## Pontuações do ranking
-        self.pontuacoes.append((nome, pontuacao))
+        bisect.insort(self.ordenadas, self._registrar(nome, pontuacao))
 
-        pontuacoes = self.pontuacoes
-    
-        for item in pontuacoes:
-            if not isinstance(item[1], int):
-                raise ValueError(f"Pontuação inválida no ranking: {item}. Deve ser um inteiro.")
+    ## Registra uma pontuação no histórico e no índice por jogador.
+    #
+    #  @param nome (str): Nome do jogador.
+    #  @param pontuacao (int): Pontuação do jogador.
+    #  @returns tuple: Chave da pontuação no índice por pontuação.
+    def _registrar(self, nome, pontuacao):
+        chave = (-pontuacao, len(self.historico), nome)
+        self.historico.append((nome, pontuacao))
+        self.por_jogador.setdefault(nome, []).append(pontuacao)
+        if nome not in self.melhores or pontuacao > self.melhores[nome]:
+            self.melhores[nome] = pontuacao
+        return chave
+
+    ## Retorna a melhor pontuação de um jogador.
+    #
+    #  @param nome (str): Nome do jogador.
+    #  @returns int: A melhor pontuação, ou None se o jogador não tiver pontuações.
+    def melhor(self, nome):
+        return self.melhores.get(nome)
+
+    ## Retorna as pontuações mais recentes de um jogador.
+    #
+    #  @param nome (str): Nome do jogador.
+    #  @param quantidade (int): Número máximo de pontuações retornadas.
+    #  @returns list: Pontuações da mais recente para a mais antiga.
+    def recentes(self, nome, quantidade=10):
+        pontuacoes = self.por_jogador.get(nome, [])
+        return pontuacoes[:-quantidade - 1:-1] if quantidade > 0 else []
 
-        self.pontuacoes.sort(key=lambda x: x[1], reverse=True)
+    ## Retorna a posição que uma pontuação ocupa (ou ocuparia) no placar.
+    #
+    #  @param pontuacao (int): Pontuação consultada.
+    #  @returns int: 1 mais o número de pontuações estritamente maiores.
+    def posicao(self, pontuacao):
+        return bisect.bisect_left(self.ordenadas, (-pontuacao,)) + 1
 
-    ## Salva o top 10 do ranking no arquivo ranking.txt.
+    ## Retorna o percentil de uma pontuação.
+    #
+    #  @param pontuacao (int): Pontuação consultada.
+    #  @returns float: Porcentagem das pontuações registradas menores ou iguais à consultada
+    #  (0 se o ranking estiver vazio).
+    def percentil(self, pontuacao):
+        if not self.ordenadas:
+            return 0.0
+        maiores = bisect.bisect_left(self.ordenadas, (-pontuacao,))
+        return 100 * (len(self.ordenadas) - maiores) / len(self.ordenadas)
+
+    ## Retorna uma página do placar.
+    #
+    #  @param numero (int): Número da página, começando em 1.
+    #  @param tamanho (int): Número de pontuações por página.
+    #  @returns list: Tuplas (posição, nome, pontuação) da página.
+    def pagina(self, numero, tamanho=10):
+        if numero < 1 or tamanho < 1:
+            raise ValueError(f"Página inválida: {numero} (tamanho {tamanho}).")
+        inicio = (numero - 1) * tamanho
+        return [(inicio + i + 1, nome, -negativa)
+                for i, (negativa, _, nome) in enumerate(self.ordenadas[inicio:inicio + tamanho])]
+
+    ## Salva o ranking no arquivo.
     #
-    #  O ranking é salvo no arquivo, com as 10 melhores pontuações.
+    #  Acrescenta ao arquivo as pontuações registradas desde o último salvamento, no
+    #  formato 'nome,pontuação', mantendo todo o histórico.
     def salvar(self):
-        with open("ranking.txt", "w") as f:
-            for nome, pontuacao in self.pontuacoes[:10]:
+        with open(self.caminho_arquivo, "a") as f:
+            for nome, pontuacao in self.historico[self._salvas:]:
                 f.write(f"{nome},{pontuacao}\n")
+        self._salvas = len(self.historico)
 
     ## Carrega os dados do ranking a partir de um arquivo.
     #
@@ -499,7 +940,7 @@ class Ranking:
     #
     #  @param caminho_arquivo (str): Caminho do arquivo onde o ranking é armazenado.
     #
-    #  @returns list: Uma lista de tuplas contendo o nome e a pontuação dos jogadores, ordenada por pontuação.
+    #  @returns list: Uma lista de tuplas contendo o nome e a pontuação dos jogadores, na ordem do arquivo.
     def carregar(self, caminho_arquivo):
         try:
             with open(caminho_arquivo, 'r') as arquivo:
@@ -517,7 +958,6 @@ class Ranking:
 
                     pontuacoes.append((nome, pontuacao))
 
-                pontuacoes.sort(key=lambda x: x[1], reverse=True)
                 return pontuacoes
         except FileNotFoundError:
             print(f"Arquivo {caminho_arquivo} não encontrado. Criando um novo ranking.")
@@ -527,11 +967,11 @@ class Ranking:
     #
     #  Exibe as 10 melhores pontuações ou uma mensagem indicando que não há pontuações registradas.
     def exibir(self):
-        if not self.pontuacoes:
+        if not self.ordenadas:
             print("Nenhuma pontuação registrada ainda.")
         else:
             print("Ranking:")
-            for i, (nome, pontuacao) in enumerate(self.pontuacoes[:10], 1):
+            for i, nome, pontuacao in self.pagina(1, 10):
                 print(f"{i}. {nome} - {pontuacao} pontos")
         input("Pressione Enter para continuar...")
 
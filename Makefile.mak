@@ -4,6 +4,10 @@ PYTEST = pytest
 DOXYGEN = doxygen
 DOXYFILE = Doxyfile
 MAIN = Jogo.py
+AFINADOR = afinador.py
+DESEMPENHO = desempenho.py
+CARGA = carga.py
+DIFERENCIAL = diferencial.py
 TESTES = testes.py
 
 # Alvo para gerar tudo
@@ -17,10 +21,26 @@ doc:
 run:
 	$(PYTHON) ./$(MAIN)
 
+# Afinar os pesos do autojogador
+afinar:
+	$(PYTHON) ./$(AFINADOR)
+
 # Rodar testes
 tests:
 	$(PYTEST) $(TESTES)/
 
+# Rodar medições de desempenho
+desempenho:
+	$(PYTHON) ./$(DESEMPENHO)
+
+# Rodar teste de carga com jogadores simulados
+carga:
+	$(PYTHON) ./$(CARGA)
+
+# Comparar os motores otimizados com a partida de referência
+diferencial:
+	$(PYTHON) ./$(DIFERENCIAL)
+
 # Limpar arquivos intermediários
 clean:
 	rm -rf html latex *.pyc __pycache__ .pytest_cache
\ No newline at end of file
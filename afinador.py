@@ -0,0 +1,266 @@
+## @package afinador
+#  Afinação evolutiva dos pesos do autojogador.
+#
+#  Evolui uma população de pesos para o `Avaliador` do módulo `autojogador`. A aptidão
+#  de cada indivíduo é a pontuação média (100 pontos por linha removida, como em
+#  `Partida`) obtida em partidas sem terminal sobre um conjunto fixo de sementes.
+#
+#  As partidas de uma geração são independentes e rodam em um conjunto de processos.
+#  Cada processo escreve a pontuação diretamente em um vetor de memória compartilhada,
+#  na posição (indivíduo, semente), em vez de devolver listas serializadas. Ao fim de
+#  cada geração o estado é gravado em um arquivo de checkpoint, que permite retomar
+#  a execução com `--retomar`.
+#
+#  Com `--cache`, as jogadas escolhidas pelo autojogador são guardadas em um cache
+#  persistente (módulo cachejogadas) compartilhado pelos processos. Os indivíduos
+#  mantidos de uma geração para a outra e as novas execuções sobre as mesmas
+#  sementes passam a ler do cache as jogadas já calculadas.
+#
+#  Uso:
+#  @code
+#  python afinador.py --geracoes 20 --populacao 16 --sementes 8 --checkpoint afinador.json
+#  python afinador.py --geracoes 40 --checkpoint afinador.json --retomar
+#  @endcode
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+from multiprocessing.sharedctypes import RawArray
+
+from autojogador import CARACTERISTICAS, jogarPartida
+
+
+## Vetor de resultados compartilhado com os processos trabalhadores
+_resultados = None
+
+## Cache de jogadas do processo trabalhador (None se não for usado)
+_cache = None
+
+
+## Inicializa um processo trabalhador com o vetor de resultados compartilhado.
+#  @param resultados Vetor de memória compartilhada com uma posição por partida.
+#  @param caminho_cache Arquivo do cache de jogadas, ou None.
+def _iniciarTrabalhador(resultados, caminho_cache=None):
+    global _resultados, _cache
+    _resultados = resultados
+    if caminho_cache is not None:
+        from cachejogadas import CacheJogadas
+        _cache = CacheJogadas(caminho_cache)
+
+
+## Joga uma partida e grava a pontuação no vetor compartilhado.
+#  @param tarefa Tupla (posição, pesos, semente, linhas, colunas, limite de peças).
+def _jogarTarefa(tarefa):
+    posicao, pesos, semente, linhas, colunas, limite_pecas = tarefa
+    _resultados[posicao] = jogarPartida(pesos, semente, linhas, colunas, limite_pecas, _cache)
+    if _cache is not None:
+        _cache.descarregar()
+
+
+## Normaliza um vetor de pesos para norma 1.
+#
+#  A ordem das jogadas depende só da direção dos pesos, não da escala.
+#  @param pesos Lista de pesos.
+#  @return Lista de pesos normalizada.
+def normalizar(pesos):
+    norma = math.sqrt(sum(peso * peso for peso in pesos))
+    if norma == 0:
+        return list(pesos)
+    return [peso / norma for peso in pesos]
+
+
+## Classe que conduz a afinação evolutiva dos pesos.
+class Afinador:
+    ## Construtor da classe Afinador.
+    #  @param populacao Número de indivíduos por geração.
+    #  @param sementes Lista de sementes das partidas usadas para medir a aptidão.
+    #  @param caminho_checkpoint Arquivo onde o estado é gravado ao fim de cada geração.
+    #  @param semente Semente do sorteio da evolução.
+    #  @param linhas Número de linhas da grade.
+    #  @param colunas Número de colunas da grade.
+    #  @param limite_pecas Número máximo de peças por partida.
+    def __init__(self, populacao, sementes, caminho_checkpoint, semente=0,
+                 linhas=20, colunas=10, limite_pecas=500):
+        if populacao < 2:
+            raise ValueError(f"População inválida: {populacao}. Deve ter ao menos 2 indivíduos.")
+        ## Sementes das partidas de avaliação
+        self.sementes = list(sementes)
+        ## Arquivo de checkpoint
+        self.caminho_checkpoint = caminho_checkpoint
+        ## Número de linhas da grade
+        self.linhas = linhas
+        ## Número de colunas da grade
+        self.colunas = colunas
+        ## Número máximo de peças por partida
+        self.limite_pecas = limite_pecas
+        ## Gerador usado na seleção, cruzamento e mutação
+        self.gerador = random.Random(semente)
+        ## Número de gerações já avaliadas
+        self.geracao = 0
+        ## Pesos de cada indivíduo da geração atual
+        self.individuos = [
+            normalizar([self.gerador.uniform(-1, 1) for _ in CARACTERISTICAS])
+            for _ in range(populacao)
+        ]
+        ## Melhores pesos encontrados até agora
+        self.melhor_pesos = None
+        ## Aptidão dos melhores pesos
+        self.melhor_aptidao = None
+        ## Melhor e média da aptidão de cada geração
+        self.historico = []
+
+    ## Mede a aptidão de todos os indivíduos da geração atual.
+    #  @param pool Conjunto de processos iniciado com _iniciarTrabalhador.
+    #  @param resultados Vetor compartilhado entregue aos processos.
+    #  @return Lista com a pontuação média de cada indivíduo.
+    def avaliar(self, pool, resultados):
+        quantidade = len(self.sementes)
+        tarefas = [
+            (i * quantidade + j, pesos, semente, self.linhas, self.colunas, self.limite_pecas)
+            for i, pesos in enumerate(self.individuos)
+            for j, semente in enumerate(self.sementes)
+        ]
+        for _ in pool.imap_unordered(_jogarTarefa, tarefas):
+            pass
+        return [
+            sum(resultados[i * quantidade:(i + 1) * quantidade]) / quantidade
+            for i in range(len(self.individuos))
+        ]
+
+    ## Escolhe um pai por torneio entre dois indivíduos.
+    #  @param ordenados Lista de (aptidão, pesos) em ordem decrescente de aptidão.
+    #  @return Tupla (aptidão, pesos) do vencedor.
+    def _torneio(self, ordenados):
+        a, b = self.gerador.sample(range(len(ordenados)), 2)
+        return ordenados[min(a, b)]
+
+    ## Gera a próxima geração a partir das aptidões da atual.
+    #
+    #  O melhor quarto da população é mantido. Os demais indivíduos são filhos de dois
+    #  pais escolhidos por torneio: a média dos pesos ponderada pela aptidão, com uma
+    #  pequena mutação em um dos pesos.
+    #  @param aptidoes Aptidão de cada indivíduo da geração atual.
+    def evoluir(self, aptidoes):
+        ordenados = sorted(zip(aptidoes, self.individuos), key=lambda x: x[0], reverse=True)
+        elite = max(1, len(ordenados) // 4)
+        nova = [pesos for _, pesos in ordenados[:elite]]
+
+        while len(nova) < len(ordenados):
+            (apt_a, pai_a), (apt_b, pai_b) = self._torneio(ordenados), self._torneio(ordenados)
+            total = apt_a + apt_b
+            fracao = 0.5 if total == 0 else apt_a / total
+            filho = [fracao * a + (1 - fracao) * b for a, b in zip(pai_a, pai_b)]
+            filho[self.gerador.randrange(len(filho))] += self.gerador.gauss(0, 0.2)
+            nova.append(normalizar(filho))
+
+        self.individuos = nova
+
+    ## Executa a afinação até completar o número de gerações pedido.
+    #  @param geracoes Número total de gerações (incluindo as já feitas antes de retomar).
+    #  @param processos Número de processos trabalhadores (None para um por núcleo).
+    #  @param caminho_cache Arquivo do cache de jogadas compartilhado pelos processos, ou None.
+    #  @return Tupla (melhores pesos, aptidão).
+    def executar(self, geracoes, processos=None, caminho_cache=None):
+        resultados = RawArray('d', len(self.individuos) * len(self.sementes))
+        with multiprocessing.Pool(processos, _iniciarTrabalhador, (resultados, caminho_cache)) as pool:
+            while self.geracao < geracoes:
+                aptidoes = self.avaliar(pool, resultados)
+                indice = max(range(len(aptidoes)), key=lambda i: aptidoes[i])
+                if self.melhor_aptidao is None or aptidoes[indice] > self.melhor_aptidao:
+                    self.melhor_aptidao = aptidoes[indice]
+                    self.melhor_pesos = list(self.individuos[indice])
+                self.historico.append([max(aptidoes), sum(aptidoes) / len(aptidoes)])
+                self.geracao += 1
+                print(f"Geração {self.geracao}: melhor {max(aptidoes):.1f}, "
+                      f"média {sum(aptidoes) / len(aptidoes):.1f}")
+
+                self.evoluir(aptidoes)
+                self.salvarCheckpoint()
+        return self.melhor_pesos, self.melhor_aptidao
+
+    ## Grava o estado da afinação no arquivo de checkpoint.
+    #
+    #  O arquivo é escrito em um temporário e renomeado, para que uma interrupção
+    #  no meio da escrita não corrompa o checkpoint anterior.
+    def salvarCheckpoint(self):
+        versao, estado, gauss = self.gerador.getstate()
+        dados = {
+            "geracao": self.geracao,
+            "individuos": self.individuos,
+            "sementes": self.sementes,
+            "linhas": self.linhas,
+            "colunas": self.colunas,
+            "limite_pecas": self.limite_pecas,
+            "melhor_pesos": self.melhor_pesos,
+            "melhor_aptidao": self.melhor_aptidao,
+            "historico": self.historico,
+            "gerador": [versao, list(estado), gauss],
+        }
+        temporario = self.caminho_checkpoint + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump(dados, f)
+        os.replace(temporario, self.caminho_checkpoint)
+
+    ## Cria um afinador a partir de um arquivo de checkpoint.
+    #  @param caminho_checkpoint Arquivo gravado por salvarCheckpoint.
+    #  @return Afinador no estado gravado.
+    @classmethod
+    def carregarCheckpoint(cls, caminho_checkpoint):
+        with open(caminho_checkpoint, "r") as f:
+            dados = json.load(f)
+
+        afinador = cls(len(dados["individuos"]), dados["sementes"], caminho_checkpoint,
+                       linhas=dados["linhas"], colunas=dados["colunas"],
+                       limite_pecas=dados["limite_pecas"])
+        afinador.geracao = dados["geracao"]
+        afinador.individuos = dados["individuos"]
+        afinador.melhor_pesos = dados["melhor_pesos"]
+        afinador.melhor_aptidao = dados["melhor_aptidao"]
+        afinador.historico = dados["historico"]
+        versao, estado, gauss = dados["gerador"]
+        afinador.gerador.setstate((versao, tuple(estado), gauss))
+        return afinador
+
+
+## Lê os argumentos da linha de comando e executa a afinação.
+def main():
+    parser = argparse.ArgumentParser(description="Afinação evolutiva dos pesos do autojogador.")
+    parser.add_argument("--geracoes", type=int, default=20, help="número total de gerações")
+    parser.add_argument("--populacao", type=int, default=16, help="indivíduos por geração")
+    parser.add_argument("--sementes", type=int, default=8, help="partidas (sementes 0..N-1) por indivíduo")
+    parser.add_argument("--processos", type=int, default=None, help="processos trabalhadores (padrão: um por núcleo)")
+    parser.add_argument("--linhas", type=int, default=20, help="linhas da grade")
+    parser.add_argument("--colunas", type=int, default=10, help="colunas da grade")
+    parser.add_argument("--limite-pecas", type=int, default=500, help="máximo de peças por partida")
+    parser.add_argument("--semente", type=int, default=0, help="semente da evolução")
+    parser.add_argument("--checkpoint", default="afinador.json", help="arquivo de checkpoint")
+    parser.add_argument("--retomar", action="store_true", help="continua a partir do checkpoint")
+    parser.add_argument("--cache", default=None, help="arquivo do cache de jogadas (padrão: sem cache)")
+    args = parser.parse_args()
+
+    if args.retomar:
+        afinador = Afinador.carregarCheckpoint(args.checkpoint)
+    else:
+        afinador = Afinador(args.populacao, range(args.sementes), args.checkpoint, args.semente,
+                            args.linhas, args.colunas, args.limite_pecas)
+
+    pesos, aptidao = afinador.executar(args.geracoes, args.processos, args.cache)
+    if args.cache is not None:
+        from cachejogadas import CacheJogadas
+        with CacheJogadas(args.cache) as cache:
+            entradas, consultas, acertos, taxa = cache.estatisticas()
+        print(f"Cache de jogadas: {entradas} entradas, {acertos}/{consultas} acertos ({taxa:.1%})")
+    if pesos is None:
+        print("Nenhuma geração avaliada.")
+        return
+    print("Melhores pesos:")
+    for nome, peso in zip(CARACTERISTICAS, pesos):
+        print(f"  {nome}: {peso:.4f}")
+    print(f"Pontuação média: {aptidao:.1f}")
+
+
+if __name__ == "__main__":
+    main()
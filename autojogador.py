@@ -0,0 +1,193 @@
+## @package autojogador
+#  Jogador automático para partidas do Textris sem terminal.
+#
+#  Contém a classe `Avaliador`, que atribui uma nota a uma grade a partir de
+#  características ponderadas por pesos, e a classe `AutoJogador`, que usa o
+#  avaliador para escolher e executar o encaixe de cada peça de uma `Partida`.
+#
+#  As jogadas são simuladas com os próprios métodos de `Peca` sobre uma cópia da
+#  grade, na mesma sequência de comandos que depois é aplicada à partida por
+#  `Partida.aplicarComando`. Assim a simulação nunca diverge das regras do jogo.
+
+import copy
+
+from Jogo import Partida, BAIXO, CODIGO_VAZIO, DIREITA, ESQUERDA, GIRAR_HORARIO
+
+
+## Nomes das características avaliadas, na ordem em que os pesos são informados.
+CARACTERISTICAS = ('altura_agregada', 'linhas_completas', 'buracos', 'irregularidade')
+
+## Pesos usados quando nenhum outro é informado.
+PESOS_PADRAO = (-0.51, 0.76, -0.36, -0.18)
+
+
+## Classe que avalia grades do jogo a partir de uma combinação linear de características.
+class Avaliador:
+    ## Construtor da classe Avaliador.
+    #  @param pesos Sequência de pesos, um para cada item de CARACTERISTICAS.
+    def __init__(self, pesos=PESOS_PADRAO):
+        if len(pesos) != len(CARACTERISTICAS):
+            raise ValueError(f"Esperados {len(CARACTERISTICAS)} pesos, recebidos {len(pesos)}.")
+        ## Pesos das características
+        self.pesos = tuple(float(peso) for peso in pesos)
+
+    ## Calcula as características de uma grade.
+    #
+    #  As linhas completas são contadas e desconsideradas no cálculo das demais
+    #  características, como se já tivessem sido removidas por `Partida.removerLinhas`.
+    #  @param grade Matriz representando a grade do jogo (de texto ou compacta).
+    #  @return Tupla (altura agregada, linhas completas, buracos, irregularidade).
+    @staticmethod
+    def caracteristicas(grade):
+        vazio = CODIGO_VAZIO if grade[0].__class__ is bytearray else " "
+        restantes = [linha for linha in grade if vazio in linha]
+        completas = len(grade) - len(restantes)
+        total_linhas = len(grade)
+        deslocamento = total_linhas - len(restantes)
+
+        alturas = []
+        buracos = 0
+        for coluna in range(len(grade[0])):
+            altura = 0
+            for indice, linha in enumerate(restantes):
+                if linha[coluna] != vazio:
+                    if altura == 0:
+                        altura = total_linhas - (indice + deslocamento)
+                elif altura:
+                    buracos += 1
+            alturas.append(altura)
+
+        irregularidade = sum(abs(a - b) for a, b in zip(alturas, alturas[1:]))
+        return sum(alturas), completas, buracos, irregularidade
+
+    ## Atribui uma nota à grade; quanto maior, melhor.
+    #  @param grade Matriz representando a grade do jogo.
+    #  @return Nota da grade.
+    def avaliar(self, grade):
+        return sum(peso * valor for peso, valor in zip(self.pesos, self.caracteristicas(grade)))
+
+
+## Classe que joga uma partida automaticamente usando um `Avaliador`.
+#
+#  Cada jogada é uma lista de comandos: rotações no sentido horário seguidas de
+#  movimentos laterais. Depois deles a peça desce até ser fixada.
+class AutoJogador:
+    ## Construtor da classe AutoJogador.
+    #  @param avaliador Avaliador usado para comparar as jogadas possíveis.
+    #  @param cache CacheJogadas (módulo cachejogadas) com jogadas já escolhidas, ou None.
+    def __init__(self, avaliador=None, cache=None):
+        ## Avaliador das jogadas
+        self.avaliador = avaliador if avaliador is not None else Avaliador()
+        ## Cache de jogadas já escolhidas (None para sempre calcular)
+        self.cache = cache
+
+    ## Escolhe a melhor jogada para a peça atual da partida.
+    #  @param partida Partida em andamento, com a peça atual posicionada na grade.
+    #  @return Lista de comandos da melhor jogada encontrada.
+    def escolherJogada(self, partida):
+        if self.cache is None:
+            return self._calcularJogada(partida)
+
+        from cachejogadas import assinatura
+
+        chave = assinatura(partida, self.avaliador.pesos)
+        jogada = self.cache.obter(chave)
+        if jogada is None:
+            jogada = self._calcularJogada(partida)
+            self.cache.guardar(chave, jogada)
+        return jogada
+
+    ## Calcula a melhor jogada simulando todas as rotações e deslocamentos da peça atual.
+    #  @param partida Partida em andamento, com a peça atual posicionada na grade.
+    #  @return Lista de comandos da melhor jogada encontrada.
+    def _calcularJogada(self, partida):
+        melhor_nota = None
+        melhor_jogada = []
+        rotacoes = 1 if partida.peca_atual.forma == 'O' else 4
+
+        for quantidade in range(rotacoes):
+            grade = [linha[:] for linha in partida.grade]
+            peca = copy.copy(partida.peca_atual)
+            jogada = [GIRAR_HORARIO] * quantidade
+
+            fixada = False
+            for _ in range(quantidade):
+                peca.rotacionar(grade, sentido_horario=True)
+                if not peca.podeMover(grade, 0, 1):
+                    fixada = True
+                    break
+
+            candidatos = [(jogada, peca, grade)] if fixada else self._deslocamentos(jogada, peca, grade)
+            for candidato, peca_final, grade_final in candidatos:
+                nota = self._notaAposQueda(peca_final, grade_final)
+                if melhor_nota is None or nota > melhor_nota:
+                    melhor_nota = nota
+                    melhor_jogada = candidato
+
+        return melhor_jogada
+
+    ## Gera as posições alcançáveis deslocando a peça para cada lado.
+    #  @param jogada Comandos já aplicados à peça.
+    #  @param peca Cópia da peça, posicionada na grade.
+    #  @param grade Cópia da grade.
+    #  @return Lista de tuplas (comandos, peça, grade) para cada posição alcançável.
+    def _deslocamentos(self, jogada, peca, grade):
+        candidatos = [(jogada, peca, grade)]
+        for comando, dx in ((ESQUERDA, -1), (DIREITA, 1)):
+            atual = copy.copy(peca)
+            grade_atual = [linha[:] for linha in grade]
+            comandos = list(jogada)
+            while atual.podeMover(grade_atual, dx, 0):
+                atual.moverPeca(grade_atual, dx, 0)
+                comandos.append(comando)
+                candidatos.append((list(comandos), copy.copy(atual), [linha[:] for linha in grade_atual]))
+                if not atual.podeMover(grade_atual, 0, 1):
+                    break
+        return candidatos
+
+    ## Avalia a grade resultante de deixar a peça cair até ser fixada.
+    #  @param peca Peça posicionada na grade.
+    #  @param grade Grade onde a peça será solta (é modificada).
+    #  @return Nota da grade resultante.
+    def _notaAposQueda(self, peca, grade):
+        peca = copy.copy(peca)
+        while peca.podeMover(grade, 0, 1):
+            peca.moverPeca(grade, 0, 1)
+        return self.avaliador.avaliar(grade)
+
+    ## Executa uma jogada na partida e deixa a peça cair até ser fixada.
+    #  @param partida Partida em andamento.
+    #  @param jogada Lista de comandos retornada por escolherJogada.
+    def executarJogada(self, partida, jogada):
+        peca = partida.peca_atual
+        for comando in jogada:
+            if partida.peca_atual is not peca:
+                return
+            partida.aplicarComando(comando)
+        while partida.jogo_ativo and partida.peca_atual is peca:
+            partida.aplicarComando(BAIXO)
+
+    ## Joga a partida até o Game Over ou até atingir o limite de peças.
+    #  @param partida Partida a ser jogada.
+    #  @param limite_pecas Número máximo de peças jogadas (None para não limitar).
+    #  @return Pontuação final da partida.
+    def jogar(self, partida, limite_pecas=None):
+        partida.posicionarPecaAtual()
+        pecas = 0
+        while partida.jogo_ativo and (limite_pecas is None or pecas < limite_pecas):
+            self.executarJogada(partida, self.escolherJogada(partida))
+            pecas += 1
+        return partida.pontuacao
+
+
+## Joga uma partida sem terminal com os pesos informados.
+#  @param pesos Pesos do avaliador.
+#  @param semente Semente do sorteio das peças.
+#  @param linhas Número de linhas da grade.
+#  @param colunas Número de colunas da grade.
+#  @param limite_pecas Número máximo de peças jogadas.
+#  @param cache CacheJogadas usado pelo autojogador, ou None.
+#  @return Pontuação final da partida.
+def jogarPartida(pesos, semente, linhas=20, colunas=10, limite_pecas=500, cache=None):
+    partida = Partida(linhas, colunas, "autojogador", None, None, semente=semente, compacta=True)
+    return AutoJogador(Avaliador(pesos), cache).jogar(partida, limite_pecas)
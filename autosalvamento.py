@@ -0,0 +1,226 @@
+## @package autosalvamento
+#  Salvamento automático e incremental de partidas em segundo plano.
+#
+#  A classe `AutoSalvamento` guarda periodicamente o estado de uma `Partida` sem
+#  interromper o loop do jogo. O loop apenas tira um instantâneo da grade (uma string
+#  por linha) e o entrega a uma thread, que faz a gravação.
+#
+#  A gravação usa dois arquivos:
+#  - o arquivo principal, no mesmo formato de `Partida.salvar_jogo`, com o estado completo;
+#  - o registro de deltas (arquivo principal + ".delta"), com as linhas da grade que
+#    mudaram desde a gravação anterior.
+#
+#  Cada delta é escrito de uma só vez e termina com uma linha ".". Um delta incompleto
+#  (por exemplo, após uma queda do programa) é ignorado na leitura. A cada
+#  `compactar_a_cada` deltas o estado completo é regravado em um arquivo temporário,
+#  renomeado sobre o principal, e o registro de deltas é recomeçado.
+#
+#  O registro começa com a etiqueta do arquivo principal sobre o qual os seus deltas
+#  foram calculados (o CRC-32 do conteúdo, ver etiqueta). Se o programa cair entre a
+#  renomeação e o recomeço do registro, os deltas antigos ficam junto a um arquivo
+#  principal mais novo; como as etiquetas não coincidem, eles são ignorados na leitura.
+#
+#  Formato do registro de deltas:
+#  @code
+#  @<etiqueta do arquivo principal>
+#  #<pontuação>
+#  <índice da linha>:<conteúdo da linha>
+#  .
+#  @endcode
+
+import os
+import threading
+import time
+import zlib
+
+from Jogo import textoLinha
+
+
+## Sufixo do arquivo de registro de deltas
+SUFIXO_DELTA = ".delta"
+
+
+## Calcula a etiqueta que liga o registro de deltas ao arquivo principal.
+#  @param conteudo Texto do arquivo principal.
+#  @return CRC-32 do texto, em hexadecimal.
+def etiqueta(conteudo):
+    return format(zlib.crc32(conteudo.encode()), "08x")
+
+
+## Aplica a uma grade carregada os deltas gravados pelo salvamento automático.
+#
+#  Os deltas só são aplicados se o registro pertencer ao arquivo principal atual (mesma
+#  etiqueta), e apenas os completos (terminados por uma linha "."); o final de um delta
+#  interrompido no meio da escrita é descartado.
+#  @param nome_arquivo Arquivo principal do salvamento.
+#  @param grade Grade lida do arquivo principal; é modificada.
+#  @param pontuacao Pontuação lida do arquivo principal.
+#  @return Pontuação após aplicar os deltas.
+def aplicarDeltas(nome_arquivo, grade, pontuacao):
+    try:
+        with open(nome_arquivo + SUFIXO_DELTA, "r") as f:
+            conteudo = f.read()
+        with open(nome_arquivo, "r") as f:
+            principal = f.read()
+    except FileNotFoundError:
+        return pontuacao
+
+    cabecalho, _, conteudo = conteudo.partition("\n")
+    if cabecalho != "@" + etiqueta(principal):
+        return pontuacao
+    fim = ("\n" + conteudo).rfind("\n.\n")
+    if fim < 0:
+        return pontuacao
+
+    pontuacao_delta = pontuacao
+    alteracoes = []
+    for registro in conteudo[:fim + 1].split("\n"):
+        if registro.startswith("#"):
+            pontuacao_delta = int(registro[1:])
+            alteracoes = []
+        elif registro == ".":
+            for indice, linha in alteracoes:
+                grade[indice] = list(linha)
+            pontuacao = pontuacao_delta
+            alteracoes = []
+        elif registro:
+            indice, linha = registro.split(":", 1)
+            alteracoes.append((int(indice), linha))
+    return pontuacao
+
+
+## Classe que salva uma partida automaticamente em segundo plano.
+class AutoSalvamento:
+    ## Construtor da classe AutoSalvamento.
+    #
+    #  Inicia a thread de gravação, que espera pelos instantâneos entregues por registrar.
+    #  @param caminho_arquivo Arquivo principal do salvamento.
+    #  @param intervalo Tempo mínimo (em segundos) entre dois instantâneos.
+    #  @param compactar_a_cada Número de deltas gravados antes de regravar o estado completo.
+    def __init__(self, caminho_arquivo, intervalo=2.0, compactar_a_cada=50):
+        ## Arquivo principal do salvamento
+        self.caminho_arquivo = caminho_arquivo
+        ## Arquivo de registro de deltas
+        self.caminho_delta = caminho_arquivo + SUFIXO_DELTA
+        ## Tempo mínimo entre dois instantâneos
+        self.intervalo = intervalo
+        ## Número de deltas gravados antes de regravar o estado completo
+        self.compactar_a_cada = compactar_a_cada
+        ## Último erro de gravação ocorrido na thread (None se não houve)
+        self.erro = None
+        self._proximo = 0.0
+        self._pendente = None
+        self._gravando = False
+        self._encerrar = False
+        self._condicao = threading.Condition()
+        self._gravado = None
+        self._deltas = 0
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    ## Tira um instantâneo da partida, se o intervalo desde o último já passou.
+    #
+    #  Chamado pelo loop do jogo a cada quadro. A peça em movimento não faz parte do
+    #  instantâneo, como em `Partida.salvar_jogo`. A gravação é feita pela thread; se
+    #  ela ainda não gravou o instantâneo anterior, ele é substituído por este.
+    #  @param partida Partida em andamento.
+    #  @param forcar Se True, tira o instantâneo mesmo antes do intervalo.
+    def registrar(self, partida, forcar=False):
+        agora = time.monotonic()
+        if not forcar and agora < self._proximo:
+            return
+        self._proximo = agora + self.intervalo
+
+        peca = partida.peca_atual
+        peca.apagaAnterior(partida.grade)
+        linhas = tuple(textoLinha(linha) for linha in partida.grade)
+        peca.posicionarTabuleiro(partida.grade)
+
+        with self._condicao:
+            self._pendente = (partida.linhas, partida.colunas, partida.jogador, partida.pontuacao, linhas)
+            self._condicao.notify()
+
+    ## Espera até que o último instantâneo entregue tenha sido gravado.
+    def aguardar(self):
+        with self._condicao:
+            while self._pendente is not None or self._gravando:
+                self._condicao.wait()
+
+    ## Grava o último instantâneo pendente e termina a thread de gravação.
+    #  @param remover Se True, apaga os arquivos do salvamento (partida terminada).
+    def encerrar(self, remover=False):
+        with self._condicao:
+            self._encerrar = True
+            self._condicao.notify()
+        self._thread.join()
+        if remover:
+            for caminho in (self.caminho_arquivo, self.caminho_delta):
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+
+    ## Laço da thread de gravação.
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while self._pendente is None and not self._encerrar:
+                    self._condicao.wait()
+                instantaneo, self._pendente = self._pendente, None
+                self._gravando = instantaneo is not None
+            if instantaneo is None:
+                return
+            try:
+                self._gravar(instantaneo)
+            except OSError as erro:
+                self.erro = erro
+            with self._condicao:
+                self._gravando = False
+                self._condicao.notify_all()
+
+    ## Grava um instantâneo como delta ou, quando necessário, como estado completo.
+    #  @param instantaneo Tupla (linhas, colunas, jogador, pontuação, linhas da grade).
+    def _gravar(self, instantaneo):
+        if (self._gravado is None or self._deltas >= self.compactar_a_cada
+                or len(self._gravado[4]) != len(instantaneo[4])):
+            self._compactar(instantaneo)
+        else:
+            self._acrescentarDelta(instantaneo)
+
+    ## Regrava o estado completo e recomeça o registro de deltas com a nova etiqueta.
+    #  @param instantaneo Tupla (linhas, colunas, jogador, pontuação, linhas da grade).
+    def _compactar(self, instantaneo):
+        linhas, colunas, jogador, pontuacao, grade = instantaneo
+        conteudo = f"{linhas}\n{colunas}\n{jogador}\n{pontuacao}\n"
+        conteudo += "".join(linha + "\n" for linha in grade)
+        temporario = self.caminho_arquivo + ".tmp"
+        with open(temporario, "w") as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho_arquivo)
+        with open(self.caminho_delta, "w") as f:
+            f.write(f"@{etiqueta(conteudo)}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._gravado = instantaneo
+        self._deltas = 0
+
+    ## Acrescenta ao registro as linhas alteradas desde a última gravação.
+    #  @param instantaneo Tupla (linhas, colunas, jogador, pontuação, linhas da grade).
+    def _acrescentarDelta(self, instantaneo):
+        anterior = self._gravado[4]
+        pontuacao, grade = instantaneo[3], instantaneo[4]
+        alteradas = [(i, linha) for i, linha in enumerate(grade) if linha != anterior[i]]
+        if not alteradas and pontuacao == self._gravado[3]:
+            return
+
+        registro = [f"#{pontuacao}\n"]
+        registro.extend(f"{i}:{linha}\n" for i, linha in alteradas)
+        registro.append(".\n")
+        with open(self.caminho_delta, "a") as f:
+            f.write("".join(registro))
+            f.flush()
+            os.fsync(f.fileno())
+        self._gravado = instantaneo
+        self._deltas += 1
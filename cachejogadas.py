@@ -0,0 +1,185 @@
+## @package cachejogadas
+#  Cache persistente das jogadas escolhidas pelo autojogador.
+#
+#  O autojogador costuma recalcular a mesma jogada para a mesma superfície da grade
+#  e a mesma peça, por exemplo ao rodar de novo o afinador sobre as mesmas sementes.
+#  A classe `CacheJogadas` guarda cada jogada escolhida em um arquivo SQLite, indexada
+#  pela assinatura da situação (ver assinatura), e a devolve nas próximas vezes.
+#
+#  A assinatura considera apenas as linhas que a peça ainda pode alcançar: as linhas
+#  abaixo do topo da coluna mais baixa ficam fora, pois não mudam a escolha do
+#  autojogador (só somam a mesma constante às características de todas as jogadas).
+#  Assim, situações com o mesmo topo da pilha e fundos diferentes compartilham a
+#  mesma entrada.
+#
+#  O arquivo pode ser compartilhado por vários processos (o SQLite cuida das travas).
+#  Cada processo mantém em memória as jogadas lidas ou guardadas mais recentemente
+#  (no máximo `capacidade`, descartando as usadas há mais tempo) e acumula as novas
+#  jogadas, os acessos e os contadores de acertos, que são gravados de uma vez por
+#  descarregar. Quando o número de entradas do arquivo passa da capacidade, as usadas
+#  há mais tempo são removidas.
+#
+#  Exemplo:
+#  @code
+#  with CacheJogadas("jogadas.sqlite") as cache:
+#      AutoJogador(cache=cache).jogar(partida)
+#      print(cache.estatisticas())
+#  @endcode
+
+import collections
+import hashlib
+import sqlite3
+import struct
+import time
+
+from Jogo import ROTACOES
+
+
+## Tabela de tradução de células da grade compacta para ocupação (0 vazia, 1 ocupada)
+_OCUPACAO = bytes([0] + [1] * 255)
+
+
+## Calcula a assinatura da situação em que o autojogador escolhe uma jogada.
+#
+#  A assinatura combina as dimensões visíveis da grade, a ocupação das linhas que a
+#  peça pode alcançar (sem a própria peça), o estado da peça atual e os pesos do
+#  avaliador.
+#  @param partida Partida em andamento, com a peça atual posicionada na grade.
+#  @param pesos Pesos do avaliador do autojogador.
+#  @return Assinatura (bytes).
+def assinatura(partida, pesos):
+    grade = partida.grade
+    if grade[0].__class__ is bytearray:
+        ocupacao = [linha.translate(_OCUPACAO) for linha in grade]
+    else:
+        ocupacao = [bytearray(celula != " " for celula in linha) for linha in grade]
+
+    peca = partida.peca_atual
+    for dx, dy in ROTACOES[peca.codigo][peca.rotacao]:
+        ocupacao[peca.y + dy][peca.x + dx] = 0
+
+    # As linhas a partir do topo da coluna mais baixa estão cobertas em todas as colunas
+    colunas = len(ocupacao[0])
+    visiveis = max(next((indice for indice, linha in enumerate(ocupacao) if linha[coluna]), len(ocupacao))
+                   for coluna in range(colunas))
+
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(struct.pack("<6i", colunas, visiveis, peca.codigo, peca.rotacao, peca.x, peca.y))
+    resumo.update(struct.pack(f"<{len(pesos)}d", *pesos))
+    for linha in ocupacao[:visiveis]:
+        resumo.update(linha)
+    return resumo.digest()
+
+
+## Classe do cache persistente de jogadas.
+class CacheJogadas:
+    ## Construtor da classe CacheJogadas.
+    #
+    #  Abre (ou cria) o arquivo do cache.
+    #  @param caminho_arquivo Arquivo SQLite do cache.
+    #  @param capacidade Número máximo de jogadas guardadas.
+    #  @param tamanho_lote Número de jogadas novas acumuladas antes de gravar.
+    def __init__(self, caminho_arquivo, capacidade=200000, tamanho_lote=100):
+        ## Arquivo do cache
+        self.caminho_arquivo = caminho_arquivo
+        ## Número máximo de jogadas guardadas
+        self.capacidade = capacidade
+        ## Número de jogadas novas acumuladas antes de gravar
+        self.tamanho_lote = tamanho_lote
+        ## Consultas feitas por este processo
+        self.consultas = 0
+        ## Consultas respondidas pelo cache neste processo
+        self.acertos = 0
+        self._memoria = collections.OrderedDict()
+        self._novas = {}
+        self._usos = {}
+        self._contadores = [0, 0]
+        self.conexao = sqlite3.connect(caminho_arquivo, timeout=30)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        with self.conexao:
+            self.conexao.execute("CREATE TABLE IF NOT EXISTS jogadas "
+                                 "(chave BLOB PRIMARY KEY, comandos TEXT NOT NULL, uso REAL NOT NULL)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS jogadas_uso ON jogadas (uso)")
+            self.conexao.execute("CREATE TABLE IF NOT EXISTS contadores "
+                                 "(nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            self.conexao.executemany("INSERT OR IGNORE INTO contadores VALUES (?, 0)",
+                                     [("consultas",), ("acertos",)])
+
+    ## Procura a jogada guardada para uma assinatura.
+    #  @param chave Assinatura calculada por assinatura.
+    #  @return Lista de comandos, ou None se a jogada não estiver no cache.
+    def obter(self, chave):
+        self.consultas += 1
+        self._contadores[0] += 1
+        jogada = self._memoria.get(chave)
+        if jogada is None:
+            linha = self.conexao.execute("SELECT comandos FROM jogadas WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            jogada = linha[0].split(",") if linha[0] else []
+        self._lembrar(chave, jogada)
+        self.acertos += 1
+        self._contadores[1] += 1
+        self._usos[chave] = time.time()
+        return list(jogada)
+
+    ## Guarda a jogada escolhida para uma assinatura.
+    #  @param chave Assinatura calculada por assinatura.
+    #  @param jogada Lista de comandos.
+    def guardar(self, chave, jogada):
+        self._lembrar(chave, list(jogada))
+        self._novas[chave] = ",".join(jogada)
+        if len(self._novas) >= self.tamanho_lote:
+            self.descarregar()
+
+    ## Mantém uma jogada na memória do processo, descartando a usada há mais tempo se
+    #  a memória passar da capacidade.
+    #  @param chave Assinatura calculada por assinatura.
+    #  @param jogada Lista de comandos.
+    def _lembrar(self, chave, jogada):
+        self._memoria[chave] = jogada
+        self._memoria.move_to_end(chave)
+        if len(self._memoria) > self.capacidade:
+            self._memoria.popitem(last=False)
+
+    ## Grava as jogadas novas, os acessos e os contadores, e remove as entradas excedentes.
+    def descarregar(self):
+        if not self._novas and not self._usos and not any(self._contadores):
+            return
+        agora = time.time()
+        with self.conexao:
+            self.conexao.executemany("INSERT OR REPLACE INTO jogadas VALUES (?, ?, ?)",
+                                     [(chave, comandos, agora) for chave, comandos in self._novas.items()])
+            self.conexao.executemany("UPDATE jogadas SET uso = ? WHERE chave = ?",
+                                     [(uso, chave) for chave, uso in self._usos.items()])
+            self.conexao.executemany("UPDATE contadores SET valor = valor + ? WHERE nome = ?",
+                                     [(self._contadores[0], "consultas"), (self._contadores[1], "acertos")])
+            excedentes = self.conexao.execute("SELECT COUNT(*) FROM jogadas").fetchone()[0] - self.capacidade
+            if excedentes > 0:
+                self.conexao.execute("DELETE FROM jogadas WHERE chave IN "
+                                     "(SELECT chave FROM jogadas ORDER BY uso LIMIT ?)", (excedentes,))
+                self._memoria.clear()
+        self._novas.clear()
+        self._usos.clear()
+        self._contadores = [0, 0]
+
+    ## Retorna os contadores acumulados no arquivo por todos os processos.
+    #  @return Tupla (entradas, consultas, acertos, taxa de acertos).
+    def estatisticas(self):
+        self.descarregar()
+        entradas = self.conexao.execute("SELECT COUNT(*) FROM jogadas").fetchone()[0]
+        contadores = dict(self.conexao.execute("SELECT nome, valor FROM contadores"))
+        consultas, acertos = contadores["consultas"], contadores["acertos"]
+        return entradas, consultas, acertos, acertos / consultas if consultas else 0.0
+
+    ## Grava as pendências e fecha o arquivo.
+    def fechar(self):
+        self.descarregar()
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
@@ -0,0 +1,335 @@
+## @package carga
+#  Teste de carga com milhares de jogadores simulados.
+#
+#  Cada jogador simulado (`Sessao`) joga uma partida sem terminal, enviando comandos
+#  em uma taxa de teclas realista, escolhidos pelo autojogador ou sorteados de um
+#  roteiro. Quando a partida termina (Game Over ou limite de peças), a pontuação é
+#  registrada em um `Ranking` compartilhado por todas as sessões e uma nova partida é
+#  iniciada. O limite de peças (padrão LIMITE_PECAS) faz as partidas terminarem mesmo
+#  em testes curtos com o autojogador, que raramente perde, para que a disputa pelo
+#  ranking seja exercitada.
+#
+#  As sessões são divididas entre algumas threads de trabalho. Cada thread mantém
+#  suas sessões em uma fila de prioridade pelo horário do próximo comando e executa
+#  cada comando quando chega a hora. Ao final, o teste informa:
+#  - a vazão (comandos aplicados por segundo);
+#  - a latência de cada comando (p50 e p99), medida apenas em `Partida.aplicarComando`,
+#    e o atraso em relação à taxa de teclas pedida, que cresce quando a máquina não dá
+#    conta da carga;
+#  - o tempo de escolha dos comandos (p99), que fica fora da latência: com o autojogador
+#    é o tempo de "pensar" do jogador simulado, gasto na mesma thread;
+#  - a memória ocupada por sessão;
+#  - a disputa pelo ranking: gravações, quantas encontraram o ranking ocupado e o
+#    tempo de espera pela vez de gravar (p50 e p99).
+#
+#  Uso:
+#  @code
+#  python carga.py --sessoes 2000 --trabalhadores 4 --teclas-por-segundo 8 --duracao 30
+#  @endcode
+
+import argparse
+import array
+import collections
+import heapq
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from Jogo import Jogador, Partida, Ranking, BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO
+
+
+## Comandos sorteados pelas sessões com roteiro (BAIXO é mais frequente, como em partidas reais)
+COMANDOS_ROTEIRO = (BAIXO, BAIXO, BAIXO, ESQUERDA, DIREITA, GIRAR_HORARIO)
+
+## Número padrão de peças por partida. Com o autojogador, uma peça leva cerca de 18
+#  comandos; a 8 teclas por segundo, cada sessão termina uma partida a cada ~7 s.
+LIMITE_PECAS = 3
+
+
+## Retorna o valor de um percentil de uma sequência de medições.
+#  @param valores Sequência de medições.
+#  @param p Percentil desejado, de 0 a 100.
+#  @return Valor do percentil (0 se não houver medições).
+def quantil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+## Classe de um jogador simulado, que joga partidas sem terminal.
+class Sessao:
+    ## Construtor da classe Sessao.
+    #
+    #  Cria o jogador e a primeira partida, já com a peça atual posicionada.
+    #  @param nome Nome do jogador.
+    #  @param semente Semente das partidas e do roteiro.
+    #  @param linhas Número de linhas da grade.
+    #  @param colunas Número de colunas da grade.
+    #  @param autojogador AutoJogador que escolhe os comandos, ou None para sortear do roteiro.
+    #  @param limite_pecas Número de peças após o qual a partida termina (None para não limitar).
+    def __init__(self, nome, semente, linhas=20, colunas=10, autojogador=None, limite_pecas=None):
+        ## Jogador simulado
+        self.jogador = Jogador(nome)
+        ## Número de linhas da grade
+        self.linhas = linhas
+        ## Número de colunas da grade
+        self.colunas = colunas
+        ## AutoJogador que escolhe os comandos (None para sortear do roteiro)
+        self.autojogador = autojogador
+        ## Número de peças após o qual a partida termina (None para não limitar)
+        self.limite_pecas = limite_pecas
+        ## Gerador das sementes das partidas e dos comandos do roteiro
+        self.gerador = random.Random(semente)
+        ## Número de partidas terminadas
+        self.partidas = 0
+        self._fila = collections.deque()
+        self._peca = None
+        self.reiniciar()
+
+    ## Inicia uma nova partida para o jogador.
+    def reiniciar(self):
+        ## Partida em andamento
+        self.partida = Partida(self.linhas, self.colunas, self.jogador.nome, None, None,
+                               semente=self.gerador.getrandbits(32), compacta=True)
+        self.partida.posicionarPecaAtual()
+        ## Número de peças fixadas na partida em andamento
+        self.pecas = 0
+        self._fila.clear()
+        self._peca = None
+
+    ## Escolhe o próximo comando da sessão.
+    #
+    #  Com o autojogador, a jogada é planejada quando uma nova peça aparece e, depois
+    #  dos comandos planejados, a peça desce até ser fixada.
+    #  @return Comando a ser aplicado.
+    def proximoComando(self):
+        if self.autojogador is None:
+            return self.gerador.choice(COMANDOS_ROTEIRO)
+        if self._peca is not self.partida.peca_atual:
+            self._peca = self.partida.peca_atual
+            self._fila.extend(self.autojogador.escolherJogada(self.partida))
+        return self._fila.popleft() if self._fila else BAIXO
+
+    ## Escolhe e aplica um comando na partida.
+    #  @return True se a partida terminou com este comando.
+    def passo(self):
+        return self.aplicar(self.proximoComando())
+
+    ## Aplica um comando já escolhido na partida.
+    #  @param comando Comando retornado por proximoComando.
+    #  @return True se a partida terminou com este comando.
+    def aplicar(self, comando):
+        peca = self.partida.peca_atual
+        self.partida.aplicarComando(comando)
+        if self.partida.peca_atual is not peca:
+            self.pecas += 1
+        if self.partida.jogo_ativo and (self.limite_pecas is None or self.pecas < self.limite_pecas):
+            return False
+        self.jogador.pontuacao = self.partida.pontuacao
+        self.partidas += 1
+        return True
+
+
+## Classe que executa o teste de carga.
+class Carga:
+    ## Construtor da classe Carga.
+    #  @param sessoes Número de jogadores simulados.
+    #  @param trabalhadores Número de threads que executam as sessões.
+    #  @param teclas_por_segundo Taxa de comandos de cada sessão.
+    #  @param duracao Duração do teste, em segundos.
+    #  @param automatico Se True, os comandos são escolhidos pelo autojogador; senão, sorteados do roteiro.
+    #  @param linhas Número de linhas da grade de cada partida.
+    #  @param colunas Número de colunas da grade de cada partida.
+    #  @param caminho_ranking Arquivo do ranking compartilhado (None para um arquivo temporário).
+    #  @param semente Semente das sessões.
+    #  @param limite_pecas Número de peças por partida (None para jogar até o Game Over).
+    #  @param rampa Tempo, em segundos, ao longo do qual as sessões começam a jogar.
+    def __init__(self, sessoes=1000, trabalhadores=4, teclas_por_segundo=8, duracao=10.0,
+                 automatico=True, linhas=20, colunas=10, caminho_ranking=None, semente=0,
+                 limite_pecas=LIMITE_PECAS, rampa=0.0):
+        if sessoes < 1 or trabalhadores < 1 or teclas_por_segundo <= 0:
+            raise ValueError("Sessões, trabalhadores e teclas por segundo devem ser positivos.")
+        ## Número de jogadores simulados
+        self.sessoes = sessoes
+        ## Número de threads que executam as sessões
+        self.trabalhadores = trabalhadores
+        ## Intervalo entre dois comandos de uma sessão
+        self.intervalo = 1 / teclas_por_segundo
+        ## Duração do teste, em segundos
+        self.duracao = duracao
+        ## Se True, os comandos são escolhidos pelo autojogador
+        self.automatico = automatico
+        ## Número de linhas da grade de cada partida
+        self.linhas = linhas
+        ## Número de colunas da grade de cada partida
+        self.colunas = colunas
+        ## Arquivo do ranking compartilhado
+        self.caminho_ranking = caminho_ranking
+        ## Semente das sessões
+        self.semente = semente
+        ## Número de peças por partida (None para jogar até o Game Over)
+        self.limite_pecas = limite_pecas
+        ## Tempo ao longo do qual as sessões começam a jogar
+        self.rampa = rampa
+
+    ## Cria as sessões, medindo a memória ocupada por cada uma.
+    #  @return Tupla (lista de sessões, bytes por sessão).
+    def criarSessoes(self):
+        from autojogador import AutoJogador
+
+        autojogador = AutoJogador() if self.automatico else None
+        tracemalloc.start()
+        try:
+            sessoes = [Sessao(f"jogador{i}", self.semente + i, self.linhas, self.colunas, autojogador,
+                              self.limite_pecas)
+                       for i in range(self.sessoes)]
+            memoria = tracemalloc.get_traced_memory()[0] / self.sessoes
+        finally:
+            tracemalloc.stop()
+        return sessoes, memoria
+
+    ## Executa o teste de carga.
+    #  @return Dicionário com as medições (ver relatorio).
+    def executar(self):
+        sessoes, memoria = self.criarSessoes()
+        with tempfile.TemporaryDirectory() as diretorio:
+            ranking = Ranking(self.caminho_ranking or os.path.join(diretorio, "ranking.txt"))
+            trava = threading.Lock()
+            medicoes = [{"latencias": array.array('d'), "atrasos": array.array('d'),
+                         "escolhas": array.array('d'), "esperas": array.array('d'), "disputadas": 0}
+                        for _ in range(self.trabalhadores)]
+
+            inicio = time.perf_counter()
+            fim = inicio + self.duracao
+            threads = [threading.Thread(target=self._trabalhar,
+                                        args=(sessoes[i::self.trabalhadores], inicio, fim, ranking, trava, medicoes[i]))
+                       for i in range(self.trabalhadores)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            decorrido = time.perf_counter() - inicio
+
+        latencias = [valor for medicao in medicoes for valor in medicao["latencias"]]
+        atrasos = [valor for medicao in medicoes for valor in medicao["atrasos"]]
+        escolhas = [valor for medicao in medicoes for valor in medicao["escolhas"]]
+        esperas = [valor for medicao in medicoes for valor in medicao["esperas"]]
+        return {
+            "sessoes": self.sessoes,
+            "passos": len(latencias),
+            "vazao": len(latencias) / decorrido,
+            "latencia_p50": quantil(latencias, 50),
+            "latencia_p99": quantil(latencias, 99),
+            "atraso_p99": quantil(atrasos, 99),
+            "escolha_p99": quantil(escolhas, 99),
+            "memoria_por_sessao": memoria,
+            "gravacoes_ranking": len(esperas),
+            "gravacoes_disputadas": sum(medicao["disputadas"] for medicao in medicoes),
+            "espera_ranking_p50": quantil(esperas, 50),
+            "espera_ranking_p99": quantil(esperas, 99),
+        }
+
+    ## Laço de uma thread de trabalho: executa os comandos das suas sessões na hora marcada.
+    #  @param sessoes Sessões desta thread.
+    #  @param inicio Instante de início do teste (time.perf_counter).
+    #  @param fim Instante de término do teste.
+    #  @param ranking Ranking compartilhado.
+    #  @param trava Trava que protege o ranking.
+    #  @param medicao Dicionário onde as medições desta thread são guardadas.
+    def _trabalhar(self, sessoes, inicio, fim, ranking, trava, medicao):
+        # Os primeiros comandos das sessões são espalhados ao longo da rampa (ou do primeiro
+        # intervalo), para que as sessões não planejem a primeira peça todas ao mesmo tempo
+        espalhamento = max(self.intervalo, self.rampa)
+        agenda = [(inicio + espalhamento * i / len(sessoes), i) for i in range(len(sessoes))]
+        heapq.heapify(agenda)
+        while agenda:
+            horario, indice = agenda[0]
+            agora = time.perf_counter()
+            if horario >= fim or agora >= fim:
+                return
+            if horario > agora:
+                time.sleep(horario - agora)
+                agora = time.perf_counter()
+
+            # A escolha do comando (o "pensar" do jogador simulado) fica fora da latência
+            sessao = sessoes[indice]
+            comando = sessao.proximoComando()
+            antes = time.perf_counter()
+            terminou = sessao.aplicar(comando)
+            depois = time.perf_counter()
+            medicao["escolhas"].append(antes - agora)
+            medicao["latencias"].append(depois - antes)
+            medicao["atrasos"].append(agora - horario)
+            heapq.heapreplace(agenda, (horario + self.intervalo, indice))
+
+            if terminou:
+                self._registrar(sessao, ranking, trava, medicao)
+                sessao.reiniciar()
+
+    ## Registra no ranking compartilhado a pontuação de uma partida terminada.
+    #  @param sessao Sessão cuja partida terminou.
+    #  @param ranking Ranking compartilhado.
+    #  @param trava Trava que protege o ranking.
+    #  @param medicao Dicionário onde as medições da thread são guardadas.
+    def _registrar(self, sessao, ranking, trava, medicao):
+        pedido = time.perf_counter()
+        if not trava.acquire(blocking=False):
+            medicao["disputadas"] += 1
+            trava.acquire()
+        try:
+            medicao["esperas"].append(time.perf_counter() - pedido)
+            ranking.adicionar(sessao.jogador.nome, sessao.jogador.pontuacao)
+            ranking.salvar()
+        finally:
+            trava.release()
+
+
+## Monta o relatório de um teste de carga.
+#  @param resultado Dicionário retornado por Carga.executar.
+#  @return Texto do relatório.
+def relatorio(resultado):
+    return "\n".join([
+        f"sessões: {resultado['sessoes']}",
+        f"vazão: {resultado['vazao']:.0f} comandos/s ({resultado['passos']} comandos)",
+        f"latência por comando: p50 {resultado['latencia_p50'] * 1000:.3f} ms, "
+        f"p99 {resultado['latencia_p99'] * 1000:.3f} ms",
+        f"atraso em relação à taxa de teclas: p99 {resultado['atraso_p99'] * 1000:.1f} ms",
+        f"escolha do comando (fora da latência): p99 {resultado['escolha_p99'] * 1000:.3f} ms",
+        f"memória por sessão: {resultado['memoria_por_sessao']:.0f} B",
+        f"gravações no ranking: {resultado['gravacoes_ranking']} "
+        f"({resultado['gravacoes_disputadas']} encontraram o ranking ocupado), "
+        f"espera p50 {resultado['espera_ranking_p50'] * 1000:.3f} ms, "
+        f"p99 {resultado['espera_ranking_p99'] * 1000:.3f} ms",
+    ])
+
+
+## Lê os argumentos da linha de comando e executa o teste de carga.
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com jogadores simulados.")
+    parser.add_argument("--sessoes", type=int, default=1000, help="número de jogadores simulados")
+    parser.add_argument("--trabalhadores", type=int, default=4, help="threads que executam as sessões")
+    parser.add_argument("--teclas-por-segundo", type=float, default=8, help="comandos por segundo de cada sessão")
+    parser.add_argument("--duracao", type=float, default=10, help="duração do teste, em segundos")
+    parser.add_argument("--linhas", type=int, default=20, help="linhas da grade")
+    parser.add_argument("--colunas", type=int, default=10, help="colunas da grade")
+    parser.add_argument("--roteiro", action="store_true", help="sorteia os comandos em vez de usar o autojogador")
+    parser.add_argument("--ranking", default=None, help="arquivo do ranking compartilhado (padrão: temporário)")
+    parser.add_argument("--semente", type=int, default=0, help="semente das sessões")
+    parser.add_argument("--limite-pecas", type=int, default=LIMITE_PECAS,
+                        help="peças por partida (0 para jogar até o Game Over)")
+    parser.add_argument("--rampa", type=float, default=0, help="segundos ao longo dos quais as sessões começam")
+    args = parser.parse_args()
+
+    carga = Carga(args.sessoes, args.trabalhadores, args.teclas_por_segundo, args.duracao,
+                  automatico=not args.roteiro, linhas=args.linhas, colunas=args.colunas,
+                  caminho_ranking=args.ranking, semente=args.semente,
+                  limite_pecas=args.limite_pecas or None, rampa=args.rampa)
+    print(relatorio(carga.executar()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+## @package desempenho
+#  Medições de desempenho do Textris.
+#
+#  Cada medição é uma função que executa um cenário, compara o resultado com um limite
+#  e retorna uma tupla (descrição, aprovado). O programa roda todas as medições da
+#  lista MEDICOES e termina com código 1 se alguma delas for reprovada.
+#
+#  Uso:
+#  @code
+#  python desempenho.py
+#  @endcode
+
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from Jogo import Partida, Tela, SIMBOLOS, BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO, FPS_MAXIMO
+
+
+## Diretório do projeto, onde está o módulo Jogo
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+## Tempo máximo (em segundos) para importar o módulo Jogo em um processo novo
+LIMITE_IMPORTACAO = 0.05
+
+## Tempo máximo (em segundos) entre uma rajada de teclas e o quadro que a exibe
+LIMITE_LATENCIA_RAJADA = 1 / FPS_MAXIMO + 0.05
+
+## Memória máxima (em bytes) de uma partida compacta 20x10 em andamento, com semente.
+# Cerca de 2,9 kB são o estado do gerador random.Random da partida.
+LIMITE_MEMORIA_PARTIDA = 5000
+
+## Tempo máximo (em segundos) de uma atualização de um mural com 64 partidas
+LIMITE_MURAL = 0.005
+
+## Fração mínima da vazão do motor mantida ao ler a observação a cada passo
+LIMITE_OBSERVACAO = 0.5
+
+## Programa executado em um processo novo para medir a importação do Jogo
+_PROGRAMA_IMPORTACAO = (
+    "import sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import Jogo\n"
+    "fim = time.perf_counter()\n"
+    "print(fim - inicio, 'readchar' in sys.modules)\n"
+)
+
+
+## Mede o tempo de importação do módulo Jogo em processos novos.
+#
+#  Verifica também que a importação não carrega a biblioteca readchar, que só é
+#  necessária para jogar no terminal.
+#  @param repeticoes Número de processos medidos.
+#  @return Tupla (descrição, aprovado).
+def medirImportacao(repeticoes=15):
+    tempos = []
+    carregou_readchar = False
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", _PROGRAMA_IMPORTACAO], cwd=DIRETORIO,
+                               capture_output=True, text=True, check=True).stdout.split()
+        tempos.append(float(saida[0]))
+        carregou_readchar = carregou_readchar or saida[1] == "True"
+
+    mediana = statistics.median(tempos)
+    aprovado = mediana <= LIMITE_IMPORTACAO and not carregou_readchar
+    descricao = (f"importação do Jogo: mediana {mediana * 1000:.2f} ms "
+                 f"(limite {LIMITE_IMPORTACAO * 1000:.0f} ms), readchar carregado: {carregou_readchar}")
+    return descricao, aprovado
+
+
+## Teclado que entrega uma única rajada de teclas e depois a tecla de saída.
+class _TecladoRajada:
+    comandos = {'b': BAIXO, 'd': DIREITA, 'e': ESQUERDA}
+
+    def __init__(self, rajada):
+        self.rajada = rajada
+        self.entregue = False
+
+    def iniciar(self):
+        pass
+
+    def parar(self):
+        pass
+
+    def ler(self):
+        if self.entregue:
+            return 's'
+        self.entregue = True
+        return self.rajada[0]
+
+    def pendentes(self):
+        return self.rajada[1:] if self.entregue else []
+
+
+## Mede o tempo entre uma rajada de repetições de tecla e o quadro que a exibe.
+#
+#  Simula uma tecla segurada (milhares de repetições) em uma grade grande e verifica que
+#  a partida aplica a rajada inteira e redesenha uma única vez dentro do limite.
+#  @param repeticoes Número de teclas na rajada.
+#  @return Tupla (descrição, aprovado).
+def medirLatenciaRajada(repeticoes=1000):
+    rajada = ['d', 'e'] * (repeticoes // 2)
+    partida = Partida(60, 40, "desempenho", None, None, semente=0)
+    quadros = []
+    exibir = Tela.exibir
+    limpar_tela = Tela.limpar_tela
+    Tela.limpar_tela = staticmethod(lambda: None)
+    Tela.exibir = staticmethod(lambda grade, pontuacao: quadros.append(time.perf_counter()) or exibir(grade, pontuacao))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            partida.jogar(teclado=_TecladoRajada(rajada))
+    finally:
+        Tela.exibir = exibir
+        Tela.limpar_tela = limpar_tela
+
+    latencia = quadros[-1] - inicio
+    aprovado = latencia <= LIMITE_LATENCIA_RAJADA and len(quadros) == 2
+    descricao = (f"rajada de {repeticoes} teclas: quadro exibido em {latencia * 1000:.1f} ms "
+                 f"(limite {LIMITE_LATENCIA_RAJADA * 1000:.0f} ms), quadros: {len(quadros)}")
+    return descricao, aprovado
+
+
+## Mede a memória ocupada por partidas sem terminal em andamento.
+#
+#  Compara partidas 20x10 com a grade de texto e com a grade compacta, cada uma com a
+#  peça atual posicionada.
+#  @param quantidade Número de partidas criadas para cada tipo de grade.
+#  @return Tupla (descrição, aprovado).
+def medirMemoriaPartidas(quantidade=2000):
+    por_partida = {}
+    for compacta in (False, True):
+        tracemalloc.start()
+        partidas = []
+        for semente in range(quantidade):
+            partida = Partida(20, 10, "bot", None, None, semente=semente, compacta=compacta)
+            partida.posicionarPecaAtual()
+            partidas.append(partida)
+        por_partida[compacta] = tracemalloc.get_traced_memory()[0] / quantidade
+        tracemalloc.stop()
+        del partidas
+
+    aprovado = por_partida[True] <= LIMITE_MEMORIA_PARTIDA
+    descricao = (f"memória por partida: texto {por_partida[False]:.0f} B, compacta {por_partida[True]:.0f} B "
+                 f"(limite {LIMITE_MEMORIA_PARTIDA} B)")
+    return descricao, aprovado
+
+
+## Mede o tempo de atualização de um mural com 64 partidas em andamento.
+#
+#  Entre duas atualizações cada partida recebe um comando, como em partidas reais
+#  assistidas a alguns quadros por segundo.
+#  @param atualizacoes Número de atualizações medidas.
+#  @return Tupla (descrição, aprovado).
+def medirMural(atualizacoes=100):
+    from espectador import Mural
+
+    partidas = [Partida(20, 10, f"bot{i}", None, None, semente=i, compacta=True) for i in range(64)]
+    for partida in partidas:
+        partida.posicionarPecaAtual()
+    mural = Mural(por_linha=16, saida=io.StringIO())
+    mural.desenhar(partidas)
+
+    tempos = []
+    for passo in range(atualizacoes):
+        for partida in partidas:
+            if partida.jogo_ativo:
+                partida.aplicarComando((BAIXO, DIREITA, BAIXO, ESQUERDA)[passo % 4])
+        inicio = time.perf_counter()
+        mural.desenhar(partidas)
+        tempos.append(time.perf_counter() - inicio)
+
+    mediana = statistics.median(tempos)
+    aprovado = mediana <= LIMITE_MURAL
+    descricao = (f"mural de 64 partidas: atualização em {mediana * 1000:.2f} ms "
+                 f"(limite {LIMITE_MURAL * 1000:.0f} ms)")
+    return descricao, aprovado
+
+
+## Aplica comandos a partidas 20x10 e lê o estado após cada comando.
+#  @param passos Número de comandos aplicados.
+#  @param ler Função chamada com a partida após cada comando, ou None.
+#  @param compacta Se True, as partidas usam a grade compacta.
+#  @param observar Se True, cada partida exporta seus buffers (Partida.observacao).
+#  @return Comandos aplicados por segundo.
+def _vazaoPassos(passos, ler=None, compacta=True, observar=False):
+    comandos = (BAIXO, DIREITA, BAIXO, ESQUERDA, GIRAR_HORARIO)
+    partida = None
+    inicio = time.perf_counter()
+    for passo in range(passos):
+        if partida is None or not partida.jogo_ativo:
+            partida = Partida(20, 10, "desempenho", None, None, semente=passo, compacta=compacta)
+            if observar:
+                partida.observacao()
+            partida.posicionarPecaAtual()
+        partida.aplicarComando(comandos[passo % len(comandos)])
+        if ler is not None:
+            ler(partida)
+    return passos / (time.perf_counter() - inicio)
+
+
+## Lê a célula de baixo e a pontuação pelos buffers exportados da partida.
+#  @param partida Partida com observação (Partida.observacao).
+#  @return Tupla (célula, pontuação).
+def _lerBuffers(partida):
+    observacao = partida.observadores[0]
+    return observacao.tabuleiro[19, 0], observacao.estado[4]
+
+
+## Converte a grade de texto em listas de códigos de célula, percorrendo as linhas.
+#  @param partida Partida com a grade de texto.
+#  @return Lista de linhas de códigos.
+def _lerListas(partida):
+    return [[SIMBOLOS.index(celula) + 1 if celula != " " else 0 for celula in linha] for linha in partida.grade]
+
+
+## Mede a vazão de passos com a leitura do estado a cada passo, como em treinamento.
+#
+#  Compara o motor sozinho, a leitura pelos buffers de Partida.observacao (que o
+#  motor mantém atualizados) e a conversão da grade de texto em listas de códigos.
+#  Os cenários são alternados e cada um guarda a melhor de várias repetições.
+#  @param passos Número de comandos aplicados em cada repetição.
+#  @param repeticoes Número de repetições de cada cenário.
+#  @return Tupla (descrição, aprovado).
+def medirObservacao(passos=20000, repeticoes=5):
+    motor = buffers = listas = 0
+    for _ in range(repeticoes):
+        motor = max(motor, _vazaoPassos(passos))
+        buffers = max(buffers, _vazaoPassos(passos, _lerBuffers, observar=True))
+        listas = max(listas, _vazaoPassos(passos, _lerListas, compacta=False))
+
+    aprovado = buffers >= LIMITE_OBSERVACAO * motor
+    descricao = (f"observação a cada passo: motor {motor:.0f} passos/s, buffers {buffers:.0f} "
+                 f"({buffers / motor:.0%}, limite {LIMITE_OBSERVACAO:.0%}), listas de texto {listas:.0f} "
+                 f"({listas / motor:.0%})")
+    return descricao, aprovado
+
+
+## Medições executadas pelo programa
+MEDICOES = [medirImportacao, medirLatenciaRajada, medirMemoriaPartidas, medirMural, medirObservacao]
+
+
+## Executa todas as medições e mostra os resultados.
+#  @return 0 se todas as medições forem aprovadas, 1 caso contrário.
+def main():
+    reprovadas = 0
+    for medicao in MEDICOES:
+        descricao, aprovado = medicao()
+        print(f"[{'ok' if aprovado else 'FALHOU'}] {descricao}")
+        if not aprovado:
+            reprovadas += 1
+    return 1 if reprovadas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+## @package diferencial
+#  Teste diferencial entre a partida de referência e os motores otimizados.
+#
+#  Cada caso de teste é gerado a partir de uma semente: dimensões da grade, semente
+#  das peças e uma sequência aleatória de comandos. O caso é jogado em lockstep na
+#  `Partida` de referência (grade de texto) e em cada motor de MOTORES, comparando a
+#  cada passo a grade, a pontuação e o estado do jogo. Exceções também são
+#  comparadas: os motores devem falhar onde a referência falha, com o mesmo tipo de
+#  exceção.
+#
+#  Quando um motor diverge, o caso é reduzido (ver reduzir) a uma reprodução mínima,
+#  que é gravada no arquivo de regressões. O teste `test_regressoes_diferenciais`
+#  (testes.py) joga de novo todos os casos gravados.
+#
+#  Os casos são verificados em paralelo, em um processo por núcleo.
+#
+#  Uso:
+#  @code
+#  python diferencial.py --casos 100000 --comandos 300 --regressoes regressoes.json
+#  @endcode
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+
+from Jogo import Partida, textoLinha, BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO, GIRAR_ANTI_HORARIO
+
+
+## Comandos sorteados nos casos de teste
+COMANDOS_DIFERENCIAIS = (BAIXO, BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO, GIRAR_ANTI_HORARIO)
+
+## Arquivo padrão das regressões encontradas, no diretório do projeto
+ARQUIVO_REGRESSOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regressoes.json")
+
+
+## Cria a partida de referência de um caso.
+#  @param linhas Número de linhas da grade.
+#  @param colunas Número de colunas da grade.
+#  @param semente Semente do sorteio das peças.
+#  @return Partida com a grade de texto.
+def motorReferencia(linhas, colunas, semente):
+    return Partida(linhas, colunas, "diferencial", None, None, semente=semente)
+
+
+## Cria a partida com a grade compacta de um caso.
+#  @param linhas Número de linhas da grade.
+#  @param colunas Número de colunas da grade.
+#  @param semente Semente do sorteio das peças.
+#  @return Partida com a grade compacta (bytearray).
+def motorCompacto(linhas, colunas, semente):
+    return Partida(linhas, colunas, "diferencial", None, None, semente=semente, compacta=True)
+
+
+## Motores comparados com a referência, por nome
+MOTORES = {'compacta': motorCompacto}
+
+
+## Gera um caso de teste a partir de uma semente.
+#  @param semente Semente do caso.
+#  @param max_comandos Número máximo de comandos do caso.
+#  @return Dicionário com linhas, colunas, semente e comandos.
+def gerarCaso(semente, max_comandos=300):
+    gerador = random.Random(semente)
+    return {
+        "linhas": gerador.randint(4, 24),
+        "colunas": gerador.randint(6, 16),
+        "semente": semente,
+        "comandos": [gerador.choice(COMANDOS_DIFERENCIAIS) for _ in range(gerador.randint(1, max_comandos))],
+    }
+
+
+## Joga um caso em um motor e entrega o estado observado após cada passo.
+#
+#  O primeiro estado é o da peça inicial posicionada; os demais, o de cada comando.
+#  Uma exceção encerra a sequência com o estado ('erro', nome da exceção).
+#  @param fabrica Função que cria a partida do motor (como motorReferencia).
+#  @param caso Caso de teste.
+#  @return Gerador de estados (grade em texto, pontuação, jogo ativo).
+def observar(fabrica, caso):
+    try:
+        partida = fabrica(caso["linhas"], caso["colunas"], caso["semente"])
+        partida.posicionarPecaAtual()
+        yield tuple(textoLinha(linha) for linha in partida.grade), partida.pontuacao, partida.jogo_ativo
+        for comando in caso["comandos"]:
+            if not partida.jogo_ativo:
+                return
+            partida.aplicarComando(comando)
+            yield tuple(textoLinha(linha) for linha in partida.grade), partida.pontuacao, partida.jogo_ativo
+    except Exception as erro:
+        yield 'erro', type(erro).__name__
+
+
+## Compara um caso na referência e nos motores, passo a passo.
+#  @param caso Caso de teste.
+#  @param motores Dicionário de motores por nome (padrão: MOTORES).
+#  @return None se todos concordam, ou dicionário com motor, passo, esperado e obtido
+#  da primeira divergência.
+def comparar(caso, motores=None):
+    motores = MOTORES if motores is None else motores
+    referencia = list(observar(motorReferencia, caso))
+    for nome, fabrica in motores.items():
+        passo = -1
+        for passo, obtido in enumerate(observar(fabrica, caso)):
+            esperado = referencia[passo] if passo < len(referencia) else None
+            if obtido != esperado:
+                return {"motor": nome, "passo": passo, "esperado": esperado, "obtido": obtido}
+        if passo + 1 < len(referencia):
+            return {"motor": nome, "passo": passo + 1, "esperado": referencia[passo + 1], "obtido": None}
+    return None
+
+
+## Reduz um caso divergente a uma reprodução mínima.
+#
+#  Descarta os comandos depois da divergência, remove blocos de comandos cada vez
+#  menores e diminui a grade, mantendo cada mudança apenas se o motor continuar
+#  divergindo da referência.
+#  @param caso Caso de teste divergente.
+#  @param nome Nome do motor que diverge.
+#  @param motores Dicionário de motores por nome (padrão: MOTORES).
+#  @return Caso reduzido.
+def reduzir(caso, nome, motores=None):
+    motores = {nome: (MOTORES if motores is None else motores)[nome]}
+    divergencia = comparar(caso, motores)
+    if divergencia is None:
+        return caso
+    caso = dict(caso, comandos=caso["comandos"][:max(divergencia["passo"], 0)])
+
+    mudou = True
+    while mudou:
+        mudou = False
+        bloco = max(len(caso["comandos"]) // 2, 1)
+        while bloco >= 1:
+            inicio = 0
+            while inicio < len(caso["comandos"]):
+                candidato = dict(caso, comandos=caso["comandos"][:inicio] + caso["comandos"][inicio + bloco:])
+                if comparar(candidato, motores) is not None:
+                    caso, mudou = candidato, True
+                else:
+                    inicio += bloco
+            bloco //= 2
+        for campo in ("linhas", "colunas"):
+            while caso[campo] > 1 and comparar(dict(caso, **{campo: caso[campo] - 1}), motores) is not None:
+                caso, mudou = dict(caso, **{campo: caso[campo] - 1}), True
+    return caso
+
+
+## Lê as regressões gravadas.
+#  @param caminho_arquivo Arquivo de regressões.
+#  @return Lista de casos (vazia se o arquivo não existir).
+def carregarRegressoes(caminho_arquivo=ARQUIVO_REGRESSOES):
+    try:
+        with open(caminho_arquivo, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+## Acrescenta um caso reduzido ao arquivo de regressões.
+#
+#  O arquivo é escrito em um temporário e renomeado, como o checkpoint do afinador.
+#  @param caminho_arquivo Arquivo de regressões.
+#  @param caso Caso reduzido.
+#  @param nome Nome do motor que diverge.
+def salvarRegressao(caminho_arquivo, caso, nome):
+    regressoes = carregarRegressoes(caminho_arquivo)
+    regressoes.append(dict(caso, motor=nome))
+    temporario = caminho_arquivo + ".tmp"
+    with open(temporario, "w") as f:
+        json.dump(regressoes, f, indent=1)
+    os.replace(temporario, caminho_arquivo)
+
+
+## Gera e compara o caso de uma semente (executado nos processos trabalhadores).
+#  @param tarefa Tupla (semente, número máximo de comandos).
+#  @return Tupla (semente, divergência ou None).
+def _verificarSemente(tarefa):
+    semente, max_comandos = tarefa
+    return semente, comparar(gerarCaso(semente, max_comandos))
+
+
+## Verifica em paralelo os casos de um intervalo de sementes.
+#
+#  As divergências são reduzidas e gravadas no processo principal, uma por motor.
+#  @param sementes Sementes dos casos.
+#  @param max_comandos Número máximo de comandos por caso.
+#  @param caminho_regressoes Arquivo onde as regressões são gravadas.
+#  @param processos Número de processos trabalhadores (None para um por núcleo).
+#  @return Lista de casos reduzidos gravados.
+def verificar(sementes, max_comandos=300, caminho_regressoes=ARQUIVO_REGRESSOES, processos=None):
+    gravados = []
+    motores_divergentes = set()
+    with multiprocessing.Pool(processos) as pool:
+        tarefas = ((semente, max_comandos) for semente in sementes)
+        for semente, divergencia in pool.imap_unordered(_verificarSemente, tarefas, chunksize=64):
+            if divergencia is None or divergencia["motor"] in motores_divergentes:
+                continue
+            motores_divergentes.add(divergencia["motor"])
+            caso = reduzir(gerarCaso(semente, max_comandos), divergencia["motor"])
+            salvarRegressao(caminho_regressoes, caso, divergencia["motor"])
+            gravados.append(caso)
+            print(f"Motor {divergencia['motor']} diverge na semente {semente}; caso reduzido a "
+                  f"{len(caso['comandos'])} comandos em {caso['linhas']}x{caso['colunas']}")
+    return gravados
+
+
+## Lê os argumentos da linha de comando e executa o teste diferencial.
+def main():
+    parser = argparse.ArgumentParser(description="Compara os motores otimizados com a partida de referência.")
+    parser.add_argument("--casos", type=int, default=10000, help="número de casos")
+    parser.add_argument("--inicio", type=int, default=0, help="semente do primeiro caso")
+    parser.add_argument("--comandos", type=int, default=300, help="máximo de comandos por caso")
+    parser.add_argument("--processos", type=int, default=None, help="processos trabalhadores (padrão: um por núcleo)")
+    parser.add_argument("--regressoes", default=ARQUIVO_REGRESSOES, help="arquivo das regressões encontradas")
+    args = parser.parse_args()
+
+    gravados = verificar(range(args.inicio, args.inicio + args.casos), args.comandos,
+                         args.regressoes, args.processos)
+    print(f"{args.casos} casos verificados, {len(gravados)} regressões gravadas em {args.regressoes}"
+          if gravados else f"{args.casos} casos verificados, nenhuma divergência")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+## @package espectador
+#  Mural para assistir a muitas partidas do Textris em um único terminal.
+#
+#  A classe `Mural` desenha as grades de várias partidas lado a lado, em ladrilhos
+#  de tamanho fixo, usando a moldura de `Tela`. Grades maiores que o ladrilho são
+#  recortadas (mostrando o fundo da grade, onde as peças se acumulam) ou reduzidas.
+#
+#  Cada atualização lê o estado atual das partidas e compara cada ladrilho com o que
+#  foi desenhado antes: apenas as linhas alteradas são reescritas, posicionando o
+#  cursor com sequências ANSI, e toda a atualização é enviada ao terminal em uma
+#  única escrita.
+#
+#  Quando as partidas rodam em outra thread, o mural não lê as grades diretamente:
+#  uma peça pode estar entre `apagaAnterior` e `posicionarTabuleiro`. Cada partida
+#  recebe um `Retratista`, observador que tira um `Retrato` (cópia imutável do estado)
+#  a cada nova peça e no fim do jogo, na própria thread da partida, e o mural desenha
+#  esses retratos (ver acompanhar).
+#
+#  Uso:
+#  @code
+#  python espectador.py --partidas 64 --fps 10
+#  @endcode
+
+import argparse
+import sys
+import threading
+import time
+
+from Jogo import Partida, Tela, textoLinha, FIM_DE_JOGO, NOVA_PECA
+
+
+## Modo de ladrilho que mostra o fundo da grade e as primeiras colunas
+RECORTAR = 'recortar'
+
+## Modo de ladrilho que reduz a grade inteira ao tamanho do ladrilho
+REDUZIR = 'reduzir'
+
+
+## Classe de uma cópia imutável do estado de uma partida, do modo como o mural a lê.
+#
+#  Tem os mesmos atributos lidos pelo mural em uma `Partida`, com a grade guardada
+#  como uma tupla de linhas de texto.
+class Retrato:
+    __slots__ = ('jogador', 'pontuacao', 'jogo_ativo', 'grade')
+
+    ## Construtor da classe Retrato.
+    #  @param partida Partida copiada; não deve estar no meio de um comando.
+    def __init__(self, partida):
+        ## Nome do jogador
+        self.jogador = partida.jogador
+        ## Pontuação no momento da cópia
+        self.pontuacao = partida.pontuacao
+        ## Se a partida estava em andamento no momento da cópia
+        self.jogo_ativo = partida.jogo_ativo
+        ## Linhas de texto da grade
+        self.grade = tuple(textoLinha(linha) for linha in partida.grade)
+
+
+## Classe que observa uma partida e guarda o retrato mais recente dela.
+#
+#  O retrato é tirado pela própria partida, ao emitir os eventos de nova peça e de fim
+#  de jogo, quando a grade está completa. Outra thread pode ler `retrato` a qualquer
+#  momento: ele é substituído por inteiro, nunca alterado.
+class Retratista:
+    ## Construtor da classe Retratista.
+    #
+    #  Tira o primeiro retrato e se registra como observador da partida; deve ser
+    #  criado antes de a partida começar a rodar em outra thread.
+    #  @param partida Partida observada.
+    def __init__(self, partida):
+        ## Partida observada
+        self.partida = partida
+        ## Retrato mais recente da partida
+        self.retrato = Retrato(partida)
+        partida.observadores.append(self)
+
+    ## Recebe um evento da partida e, se for de nova peça ou fim de jogo, tira um novo retrato.
+    #  @param evento Dicionário com os campos de CAMPOS_EVENTO.
+    def __call__(self, evento):
+        if evento['tipo'] == NOVA_PECA or evento['tipo'] == FIM_DE_JOGO:
+            self.retrato = Retrato(self.partida)
+
+
+## Classe que desenha várias partidas lado a lado no terminal.
+class Mural:
+    ## Construtor da classe Mural.
+    #  @param por_linha Número de ladrilhos em cada linha do mural.
+    #  @param largura Número de colunas da grade mostradas em cada ladrilho.
+    #  @param altura Número de linhas da grade mostradas em cada ladrilho.
+    #  @param modo RECORTAR ou REDUZIR, para grades maiores que o ladrilho.
+    #  @param saida Arquivo onde o mural é escrito (padrão: sys.stdout).
+    def __init__(self, por_linha=8, largura=10, altura=20, modo=RECORTAR, saida=None):
+        if modo not in (RECORTAR, REDUZIR):
+            raise ValueError(f"Modo inválido: {modo}")
+        ## Número de ladrilhos em cada linha do mural
+        self.por_linha = por_linha
+        ## Colunas da grade mostradas em cada ladrilho
+        self.largura = largura
+        ## Linhas da grade mostradas em cada ladrilho
+        self.altura = altura
+        ## Modo de ajuste das grades ao ladrilho
+        self.modo = modo
+        ## Arquivo onde o mural é escrito
+        self.saida = saida if saida is not None else sys.stdout
+        self._anteriores = None
+
+    ## Ajusta as linhas de texto de uma grade ao tamanho do ladrilho.
+    #  @param linhas Linhas de texto da grade.
+    #  @return Lista com `altura` strings de `largura` caracteres.
+    def _ajustar(self, linhas):
+        if self.modo == REDUZIR and (len(linhas) > self.altura or len(linhas[0]) > self.largura):
+            passo_y = -(-len(linhas) // self.altura)
+            passo_x = -(-len(linhas[0]) // self.largura)
+            reduzidas = []
+            for topo in range(0, len(linhas), passo_y):
+                bloco = linhas[topo:topo + passo_y]
+                reduzida = []
+                for esquerda in range(0, len(linhas[0]), passo_x):
+                    celulas = "".join(linha[esquerda:esquerda + passo_x] for linha in bloco).strip()
+                    reduzida.append(celulas[0] if celulas else " ")
+                reduzidas.append("".join(reduzida))
+            linhas = reduzidas
+
+        linhas = [linha[:self.largura].ljust(self.largura) for linha in linhas[-self.altura:]]
+        vazia = " " * self.largura
+        return [vazia] * (self.altura - len(linhas)) + linhas
+
+    ## Monta as linhas de texto do ladrilho de uma partida.
+    #
+    #  A primeira linha mostra o jogador e a pontuação (e "FIM" após o Game Over),
+    #  seguida da grade ajustada dentro da moldura de `Tela`.
+    #  @param partida Partida (ou Retrato) mostrada no ladrilho.
+    #  @return Lista de strings do ladrilho, todas com a mesma largura.
+    def ladrilho(self, partida):
+        titulo = f"{partida.jogador} {partida.pontuacao}"
+        if not partida.jogo_ativo:
+            titulo += " FIM"
+        linhas = self._ajustar([textoLinha(linha) for linha in partida.grade])
+        return [titulo[:self.largura + 2].ljust(self.largura + 2)] + Tela.moldura(linhas)
+
+    ## Desenha o estado atual das partidas, reescrevendo apenas as linhas alteradas.
+    #
+    #  Na primeira chamada (ou se o número de partidas mudar) a tela é limpa e o mural
+    #  é desenhado por inteiro.
+    #  @param partidas Lista de partidas (ou retratos), na ordem dos ladrilhos.
+    #  @return Número de linhas de ladrilho reescritas.
+    def desenhar(self, partidas):
+        partes = []
+        if self._anteriores is None or len(self._anteriores) != len(partidas):
+            partes.append("\x1b[2J")
+            self._anteriores = [None] * len(partidas)
+
+        altura_ladrilho = self.altura + 3
+        reescritas = 0
+        for indice, partida in enumerate(partidas):
+            linhas = self.ladrilho(partida)
+            anteriores = self._anteriores[indice]
+            topo = (indice // self.por_linha) * (altura_ladrilho + 1) + 1
+            esquerda = (indice % self.por_linha) * (self.largura + 3) + 1
+            for deslocamento, linha in enumerate(linhas):
+                if anteriores is None or anteriores[deslocamento] != linha:
+                    partes.append(f"\x1b[{topo + deslocamento};{esquerda}H{linha}")
+                    reescritas += 1
+            self._anteriores[indice] = linhas
+
+        linhas_mural = -(-len(partidas) // self.por_linha) * (altura_ladrilho + 1)
+        partes.append(f"\x1b[{linhas_mural + 1};1H")
+        self.saida.write("".join(partes))
+        self.saida.flush()
+        return reescritas
+
+    ## Redesenha o mural em uma taxa fixa até que todas as partidas terminem.
+    #
+    #  Pode ser executado em uma thread própria enquanto as partidas rodam em outra;
+    #  nesse caso, passe um Retratista de cada partida, e cada atualização desenha os
+    #  retratos mais recentes. Partidas passadas diretamente são lidas no estado atual,
+    #  o que só é seguro se nenhuma outra thread as estiver alterando. Quando `parar` é
+    #  sinalizado, o mural é desenhado uma última vez e o acompanhamento termina.
+    #  @param partidas Lista de retratistas (ou de partidas).
+    #  @param fps Número de atualizações por segundo.
+    #  @param parar Evento (threading.Event) que encerra o acompanhamento, ou None.
+    def acompanhar(self, partidas, fps=10, parar=None):
+        intervalo = 1 / fps
+        while True:
+            inicio = time.monotonic()
+            estados = [fonte.retrato if isinstance(fonte, Retratista) else fonte for fonte in partidas]
+            self.desenhar(estados)
+            if (parar is not None and parar.is_set()) or not any(estado.jogo_ativo for estado in estados):
+                return
+            espera = intervalo - (time.monotonic() - inicio)
+            if espera > 0:
+                if parar is None:
+                    time.sleep(espera)
+                else:
+                    parar.wait(espera)
+
+
+## Joga as partidas com o autojogador, uma peça de cada partida por vez.
+#  @param partidas Lista de partidas ainda não iniciadas.
+#  @param limite_pecas Número máximo de peças por partida.
+#  @param parar Evento que interrompe as partidas.
+def jogarAutomaticamente(partidas, limite_pecas, parar):
+    from autojogador import AutoJogador
+
+    jogador = AutoJogador()
+    for partida in partidas:
+        partida.posicionarPecaAtual()
+    for _ in range(limite_pecas):
+        ativas = [partida for partida in partidas if partida.jogo_ativo]
+        if not ativas or parar.is_set():
+            break
+        for partida in ativas:
+            jogador.executarJogada(partida, jogador.escolherJogada(partida))
+
+
+## Lê os argumentos da linha de comando e mostra partidas do autojogador no mural.
+def main():
+    parser = argparse.ArgumentParser(description="Assiste a várias partidas do autojogador.")
+    parser.add_argument("--partidas", type=int, default=64, help="número de partidas")
+    parser.add_argument("--por-linha", type=int, default=16, help="ladrilhos por linha do mural")
+    parser.add_argument("--linhas", type=int, default=20, help="linhas da grade")
+    parser.add_argument("--colunas", type=int, default=10, help="colunas da grade")
+    parser.add_argument("--largura", type=int, default=10, help="colunas mostradas em cada ladrilho")
+    parser.add_argument("--altura", type=int, default=12, help="linhas mostradas em cada ladrilho")
+    parser.add_argument("--modo", choices=(RECORTAR, REDUZIR), default=RECORTAR, help="ajuste da grade ao ladrilho")
+    parser.add_argument("--fps", type=float, default=10, help="atualizações do mural por segundo")
+    parser.add_argument("--limite-pecas", type=int, default=300, help="máximo de peças por partida")
+    args = parser.parse_args()
+
+    partidas = [Partida(args.linhas, args.colunas, f"bot{i}", None, None, semente=i, compacta=True)
+                for i in range(args.partidas)]
+    retratistas = [Retratista(partida) for partida in partidas]
+    parar = threading.Event()
+
+    # As partidas que atingem o limite de peças continuam ativas; o fim da thread
+    # de jogo é sinalizado ao mural por `parar`.
+    def jogar():
+        try:
+            jogarAutomaticamente(partidas, args.limite_pecas, parar)
+        finally:
+            parar.set()
+
+    jogos = threading.Thread(target=jogar, daemon=True)
+    jogos.start()
+    try:
+        Mural(args.por_linha, args.largura, args.altura, args.modo).acompanhar(retratistas, args.fps, parar)
+    except KeyboardInterrupt:
+        parar.set()
+    jogos.join()
+
+
+if __name__ == "__main__":
+    main()
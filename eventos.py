@@ -0,0 +1,133 @@
+## @package eventos
+#  Exportação dos eventos de partidas do Textris.
+#
+#  Uma `Partida` envia cada evento (nova peça, movimento, rotação, fixação, linhas
+#  removidas, pontuação, salvamento e fim de jogo) para as funções da sua lista
+#  `observadores`. Este módulo oferece observadores prontos:
+#
+#  - GravadorJSONL: grava um evento por linha em JSON.
+#  - GravadorCSV: grava um evento por linha em CSV, com as colunas de CAMPOS_EVENTO.
+#  - fluxoEventos: gerador que joga uma partida e entrega os eventos à medida que ocorrem.
+#
+#  Os gravadores acumulam no máximo `tamanho_lote` eventos e escrevem o lote inteiro
+#  de uma vez, de modo que a memória usada não depende da duração da partida e a
+#  escrita em disco não acontece a cada comando.
+#
+#  Exemplo:
+#  @code
+#  with GravadorJSONL("eventos.jsonl") as gravador:
+#      partida = Partida(20, 10, "bot-1", None, None, semente=1)
+#      partida.observadores.append(gravador)
+#      AutoJogador().jogar(partida)
+#  @endcode
+
+import abc
+import csv
+import json
+
+from Jogo import CAMPOS_EVENTO
+
+
+## Classe base dos gravadores de eventos em arquivo.
+#
+#  Um gravador é chamado com cada evento e o guarda em um lote. Quando o lote atinge
+#  `tamanho_lote` eventos, ele é escrito no arquivo com `_escreverLote`, que cada
+#  subclasse implementa com o seu formato.
+class Gravador(abc.ABC):
+    ## Construtor da classe Gravador.
+    #  @param caminho_arquivo Arquivo onde os eventos são gravados.
+    #  @param tamanho_lote Número de eventos acumulados antes de cada escrita.
+    #  @param modo Modo de abertura do arquivo ('w' para sobrescrever, 'a' para acrescentar).
+    def __init__(self, caminho_arquivo, tamanho_lote=1000, modo='w'):
+        if tamanho_lote < 1:
+            raise ValueError(f"Tamanho de lote inválido: {tamanho_lote}. Deve ser ao menos 1.")
+        ## Arquivo de saída
+        self.arquivo = open(caminho_arquivo, modo, newline='', encoding='utf-8')
+        ## Número de eventos acumulados antes de cada escrita
+        self.tamanho_lote = tamanho_lote
+        ## Eventos ainda não escritos
+        self.lote = []
+
+    ## Recebe um evento da partida.
+    #  @param evento Dicionário com os campos de CAMPOS_EVENTO.
+    def __call__(self, evento):
+        self.lote.append(evento)
+        if len(self.lote) >= self.tamanho_lote:
+            self.descarregar()
+
+    ## Escreve os eventos acumulados no arquivo.
+    def descarregar(self):
+        if self.lote:
+            self._escreverLote(self.lote)
+            self.lote = []
+
+    ## Escreve um lote de eventos no arquivo; implementado pelas subclasses.
+    #  @param lote Lista de eventos.
+    @abc.abstractmethod
+    def _escreverLote(self, lote):
+        pass
+
+    ## Escreve os eventos pendentes e fecha o arquivo.
+    def fechar(self):
+        self.descarregar()
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+## Gravador de eventos no formato JSON Lines (um objeto JSON por linha).
+class GravadorJSONL(Gravador):
+    ## Escreve um lote de eventos, um por linha.
+    #  @param lote Lista de eventos.
+    def _escreverLote(self, lote):
+        self.arquivo.write("".join(json.dumps(evento, ensure_ascii=False) + "\n" for evento in lote))
+
+
+## Gravador de eventos no formato CSV, com cabeçalho e as colunas de CAMPOS_EVENTO.
+class GravadorCSV(Gravador):
+    ## Construtor da classe GravadorCSV.
+    #
+    #  O cabeçalho é escrito apenas se o arquivo estiver vazio.
+    #  @param caminho_arquivo Arquivo onde os eventos são gravados.
+    #  @param tamanho_lote Número de eventos acumulados antes de cada escrita.
+    #  @param modo Modo de abertura do arquivo ('w' para sobrescrever, 'a' para acrescentar).
+    def __init__(self, caminho_arquivo, tamanho_lote=1000, modo='w'):
+        super().__init__(caminho_arquivo, tamanho_lote, modo)
+        ## Escritor CSV sobre o arquivo de saída
+        self.escritor = csv.writer(self.arquivo)
+        if self.arquivo.tell() == 0:
+            self.escritor.writerow(CAMPOS_EVENTO)
+
+    ## Escreve um lote de eventos, um por linha.
+    #  @param lote Lista de eventos.
+    def _escreverLote(self, lote):
+        self.escritor.writerows([evento[campo] for campo in CAMPOS_EVENTO] for evento in lote)
+
+
+## Joga uma partida com a sequência de comandos dada e entrega os eventos gerados.
+#
+#  A partida é iniciada (a peça atual é posicionada) e cada comando é aplicado com
+#  `Partida.aplicarComando`. Os eventos de cada comando são entregues antes que o
+#  próximo seja aplicado, então a memória usada não cresce com a partida.
+#  @param partida Partida ainda não iniciada.
+#  @param comandos Sequência (ou iterador) de comandos da partida.
+#  @return Gerador de eventos.
+def fluxoEventos(partida, comandos):
+    pendentes = []
+    partida.observadores.append(pendentes.append)
+    try:
+        partida.posicionarPecaAtual()
+        yield from pendentes
+        pendentes.clear()
+        for comando in comandos:
+            if not partida.jogo_ativo:
+                break
+            partida.aplicarComando(comando)
+            yield from pendentes
+            pendentes.clear()
+    finally:
+        partida.observadores.remove(pendentes.append)
@@ -0,0 +1,135 @@
+## @package observacao
+#  Exportação do estado de uma partida em buffers, sem cópias a cada passo.
+#
+#  A classe `Observacao` mantém, para uma `Partida`, dois buffers alocados uma única
+#  vez e expostos pelo protocolo de buffer do Python (memoryview):
+#  - `tabuleiro`: as células da grade em um bytearray contíguo, um byte por célula,
+#    com os códigos da grade compacta (CODIGO_VAZIO ou código da peça + 1) e formato
+#    (linhas, colunas);
+#  - `estado`: um array de inteiros de 64 bits com os campos de CAMPOS_OBSERVACAO
+#    (peça atual, rotação, posição, pontuação e jogo ativo).
+#
+#  A observação é um observador da partida (ver `Partida.observadores`): a cada
+#  evento, apenas as linhas ocupadas pela peça antes e depois do evento são
+#  copiadas para o buffer, e a grade inteira só é copiada quando linhas são
+#  removidas. Quem lê a observação não precisa percorrer a grade nem converter
+#  nada; por exemplo, com numpy:
+#  @code
+#  observacao = partida.observacao()
+#  tabuleiro = numpy.asarray(observacao.tabuleiro)   # sem cópia, shape (linhas, colunas)
+#  estado = numpy.asarray(observacao.estado)
+#  partida.aplicarComando(BAIXO)                      # tabuleiro e estado já refletem o comando
+#  @endcode
+#
+#  Alterações feitas diretamente em `partida.grade`, fora dos métodos da partida,
+#  só aparecem na observação após atualizar().
+
+import array
+
+from Jogo import (ROTACOES, FORMAS, NOVA_PECA, MOVIMENTO, ROTACAO, LINHAS_REMOVIDAS,
+                  PONTUACAO, FIM_DE_JOGO, linhaCompacta)
+
+
+## Campos do buffer de estado, na ordem em que aparecem
+CAMPOS_OBSERVACAO = ('codigo', 'rotacao', 'x', 'y', 'pontuacao', 'jogo_ativo')
+
+## Eventos que movem a peça atual na grade
+_EVENTOS_PECA = (NOVA_PECA, MOVIMENTO, ROTACAO)
+
+## Menor e maior deslocamento vertical de cada forma em cada rotação, por [código][rotação]
+_FAIXAS = tuple(tuple((min(dy for _, dy in coordenadas), max(dy for _, dy in coordenadas))
+                      for coordenadas in rotacoes) for rotacoes in ROTACOES)
+
+
+## Classe que exporta o estado de uma partida em buffers contíguos.
+class Observacao:
+    ## Construtor da classe Observacao.
+    #
+    #  Aloca os buffers, copia o estado atual da partida e passa a acompanhar os
+    #  eventos dela.
+    #  @param partida Partida observada (de texto ou compacta).
+    def __init__(self, partida):
+        ## Partida observada
+        self.partida = partida
+        ## Células da grade, linha após linha (bytearray contíguo)
+        self.celulas = bytearray(partida.linhas * partida.colunas)
+        ## Visão (linhas, colunas) das células, sem cópia
+        self.tabuleiro = memoryview(self.celulas).cast('B', (partida.linhas, partida.colunas))
+        ## Valores de CAMPOS_OBSERVACAO
+        self.valores = array.array('q', bytes(8 * len(CAMPOS_OBSERVACAO)))
+        ## Visão dos valores de CAMPOS_OBSERVACAO, sem cópia
+        self.estado = memoryview(self.valores)
+        self._faixa_peca = (0, 0)
+        self.atualizar()
+        partida.observadores.append(self)
+
+    ## Copia a grade inteira e o estado da partida para os buffers.
+    def atualizar(self):
+        self._copiarLinhas(0, self.partida.linhas)
+        inicio, fim = self._faixaDaPeca()
+        self._faixa_peca = (max(inicio, 0), fim)
+        self._copiarEstado()
+
+    ## Recebe um evento da partida e atualiza as partes afetadas dos buffers.
+    #  @param evento Dicionário com os campos de CAMPOS_EVENTO.
+    def __call__(self, evento):
+        tipo = evento['tipo']
+        if tipo in _EVENTOS_PECA:
+            inicio, fim = faixa = self._faixaDaPeca()
+            anterior_inicio, anterior_fim = self._faixa_peca
+            if inicio < 0:
+                self.atualizar()
+                return
+            if anterior_fim < inicio or fim < anterior_inicio:
+                self._copiarLinhas(anterior_inicio, anterior_fim)
+                self._copiarLinhas(inicio, fim)
+            else:
+                self._copiarLinhas(min(anterior_inicio, inicio), max(anterior_fim, fim))
+            self._faixa_peca = faixa
+            self._copiarEstado()
+        elif tipo == LINHAS_REMOVIDAS or tipo == FIM_DE_JOGO:
+            self.atualizar()
+        elif tipo == PONTUACAO:
+            self.valores[4] = self.partida.pontuacao
+
+    ## Deixa de acompanhar os eventos da partida.
+    def encerrar(self):
+        self.partida.observadores.remove(self)
+
+    ## Retorna o intervalo de linhas da grade ocupado pela peça atual.
+    #
+    #  O início é negativo se a peça passar do topo da grade; como índices negativos
+    #  dão a volta na grade, nesse caso a grade inteira é copiada.
+    #  @return Tupla (primeira linha, linha seguinte à última).
+    def _faixaDaPeca(self):
+        peca = self.partida.peca_atual
+        menor, maior = _FAIXAS[peca.codigo][peca.rotacao]
+        return peca.y + menor, min(peca.y + maior + 1, self.partida.linhas)
+
+    ## Copia um intervalo de linhas da grade para o buffer de células.
+    #  @param inicio Primeira linha copiada.
+    #  @param fim Linha seguinte à última copiada.
+    def _copiarLinhas(self, inicio, fim):
+        linhas = self.partida.grade[inicio:fim]
+        if linhas and linhas[0].__class__ is not bytearray:
+            linhas = [linhaCompacta(linha) for linha in linhas]
+        colunas = self.partida.colunas
+        self.celulas[inicio * colunas:fim * colunas] = b"".join(linhas)
+
+    ## Copia a peça atual, a pontuação e o estado do jogo para o buffer de estado.
+    def _copiarEstado(self):
+        peca = self.partida.peca_atual
+        valores = self.valores
+        valores[0] = peca.codigo
+        valores[1] = peca.rotacao
+        valores[2] = peca.x
+        valores[3] = peca.y
+        valores[4] = self.partida.pontuacao
+        valores[5] = self.partida.jogo_ativo
+
+    ## Retorna o estado como dicionário (para depuração e testes).
+    #  @return Dicionário com os campos de CAMPOS_OBSERVACAO e a forma da peça.
+    def comoDicionario(self):
+        dados = dict(zip(CAMPOS_OBSERVACAO, self.valores))
+        dados['forma'] = FORMAS[dados['codigo']]
+        return dados
@@ -1,5 +1,24 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+
 import pytest
-from Jogo import Peca, Partida, TETROMINOES
+from Jogo import Peca, Partida, Tela, Teclado, Ranking, TETROMINOES, BAIXO, DIREITA, ESQUERDA, GIRAR_HORARIO, GIRAR_ANTI_HORARIO, CAMPOS_EVENTO, textoLinha, linhaCompacta
+from autojogador import Avaliador, AutoJogador, PESOS_PADRAO, jogarPartida
+from afinador import Afinador, _iniciarTrabalhador
+from eventos import GravadorCSV, GravadorJSONL, fluxoEventos
+from autosalvamento import AutoSalvamento, aplicarDeltas, etiqueta
+from espectador import Mural, Retratista, REDUZIR
+from carga import Carga, Sessao, quantil
+from cachejogadas import CacheJogadas, assinatura
+from diferencial import carregarRegressoes, comparar, gerarCaso, motorReferencia, reduzir, salvarRegressao
+from observacao import CAMPOS_OBSERVACAO
 
 @pytest.fixture
 def tabuleiro_vazio():
@@ -71,4 +90,477 @@ def test_partida_movimentos(partida):
     peca = partida.peca_atual
     peca.posicionarTabuleiro(partida.grade)
     assert partida.peca_atual.moverPeca(partida.grade, -1, 0) is None
-    assert peca.x == 4  # Verifica se a peça se moveu para a esquerda
\ No newline at end of file
+    assert peca.x == 4  # Verifica se a peça se moveu para a esquerda
+
+def test_partida_semente_reproduz_pecas():
+    a = Partida(20, 10, "A", None, None, semente=7)
+    b = Partida(20, 10, "B", None, None, semente=7)
+    for _ in range(20):
+        assert a.peca_atual.forma == b.peca_atual.forma
+        a.fixarPeca()
+        b.fixarPeca()
+
+def test_partida_aplicar_comando_fixa_peca(partida):
+    partida.posicionarPecaAtual()
+    peca = partida.peca_atual
+    while partida.peca_atual is peca:
+        partida.aplicarComando(BAIXO)
+    assert any(c != ' ' for c in partida.grade[-1])
+    assert partida.peca_atual is not peca
+
+def test_partida_comando_invalido(partida):
+    with pytest.raises(ValueError):
+        partida.aplicarComando('pular')
+
+def test_peca_rotacao_nao_altera_tetrominoes(tabuleiro_vazio):
+    originais = {forma: list(coord) for forma, coord in TETROMINOES.items()}
+    peca = Peca(10)
+    peca.y = 5
+    peca.posicionarTabuleiro(tabuleiro_vazio)
+    peca.rotacionar(tabuleiro_vazio)
+    assert TETROMINOES == originais
+
+class TecladoFalso:
+    """Entrega as teclas em rajadas: a primeira por ler(), o restante por pendentes()."""
+    comandos = {'b': BAIXO}
+
+    def __init__(self, rajadas):
+        self.rajadas = list(rajadas)
+        self.restante = []
+
+    def iniciar(self):
+        pass
+
+    def parar(self):
+        pass
+
+    def ler(self):
+        primeira, *self.restante = self.rajadas.pop(0)
+        return primeira
+
+    def pendentes(self):
+        teclas, self.restante = self.restante, []
+        return teclas
+
+class TecladoInterrompido(TecladoFalso):
+    """Como TecladoFalso, mas simula um Ctrl+C quando as rajadas acabam."""
+
+    def ler(self):
+        if not self.rajadas:
+            raise KeyboardInterrupt
+        return super().ler()
+
+def test_partida_jogar_aplica_rajada_em_um_quadro(monkeypatch):
+    quadros = []
+    monkeypatch.setattr(Tela, "limpar_tela", lambda: None)
+    monkeypatch.setattr(Tela, "exibir", lambda grade, pontuacao: quadros.append(pontuacao))
+    partida = Partida(20, 10, "Jogador", None, None, semente=1)
+    peca = partida.peca_atual
+    partida.jogar(fps_maximo=1000, teclado=TecladoFalso([['b', 'b', 'x', 'b'], ['s']]))
+    assert peca.y == 3
+    assert len(quadros) == 2  # quadro inicial + um quadro para a rajada inteira
+
+def test_teclado_rajada_de_setas_no_terminal(monkeypatch):
+    pytest.importorskip("readchar")
+    pty = pytest.importorskip("pty")
+    from readchar import key
+    mestre, escravo = pty.openpty()
+    try:
+        monkeypatch.setattr(sys, "stdin", open(escravo, closefd=False))
+        teclado = Teclado()
+        teclado.iniciar()
+        # Mais de 1024 bytes: as leituras cortam sequências de escape ao meio
+        os.write(mestre, key.DOWN.encode() * 700)
+        teclas = [teclado.ler()]
+        prazo = time.monotonic() + 5
+        while len(teclas) < 700 and time.monotonic() < prazo:
+            teclas += teclado.pendentes()
+        teclado.parar()
+    finally:
+        os.close(mestre)
+        os.close(escravo)
+    assert teclas == [key.DOWN] * 700
+
+def test_peca_compacta_sem_dicionario(peca):
+    assert not hasattr(peca, '__dict__')
+    assert peca.coordenadas in [tuple(TETROMINOES[peca.forma])]
+
+def test_partida_compacta_equivale_a_de_texto(capsys):
+    texto = Partida(20, 10, "Jogador", None, None, semente=5)
+    compacta = Partida(20, 10, "Jogador", None, None, semente=5, compacta=True)
+    for partida in (texto, compacta):
+        partida.posicionarPecaAtual()
+        for comando in [GIRAR_HORARIO, ESQUERDA, ESQUERDA] + [BAIXO] * 25 + [DIREITA] + [BAIXO] * 25:
+            partida.aplicarComando(comando)
+    assert [textoLinha(linha) for linha in compacta.grade] == [textoLinha(linha) for linha in texto.grade]
+    Tela.exibir(texto.grade, texto.pontuacao)
+    saida_texto = capsys.readouterr().out
+    Tela.exibir(compacta.grade, compacta.pontuacao)
+    assert capsys.readouterr().out == saida_texto
+
+### Testes do Autojogador ###
+
+def test_avaliador_caracteristicas():
+    grade = [[" "] * 4 for _ in range(4)]
+    grade[3] = ['#', '#', '#', '#']
+    grade[2][0] = '#'
+    grade[1][2] = '#'
+    # Linha completa removida: alturas [1, 0, 2, 0], um buraco sob a coluna 2
+    assert Avaliador.caracteristicas(grade) == (3, 1, 1, 5)
+
+def test_autojogador_partida_deterministica():
+    assert jogarPartida(PESOS_PADRAO, 3, limite_pecas=60) == jogarPartida(PESOS_PADRAO, 3, limite_pecas=60)
+
+### Testes do Afinador ###
+
+def test_afinador_avalia_em_memoria_compartilhada(tmp_path):
+    afinador = Afinador(3, [0, 1], str(tmp_path / "afinador.json"), semente=5, limite_pecas=15)
+    afinador.individuos[0] = list(PESOS_PADRAO)
+    resultados = multiprocessing.RawArray('d', 3 * 2)
+    with multiprocessing.Pool(1, _iniciarTrabalhador, (resultados,)) as pool:
+        aptidoes = afinador.avaliar(pool, resultados)
+    for i, pesos in enumerate(afinador.individuos):
+        pontuacoes = [jogarPartida(pesos, semente, limite_pecas=15) for semente in (0, 1)]
+        assert list(resultados[i * 2:(i + 1) * 2]) == pontuacoes  # posição (indivíduo, semente)
+        assert aptidoes[i] == sum(pontuacoes) / 2
+    assert aptidoes[0] > 0
+
+def test_afinador_retoma_do_checkpoint(tmp_path):
+    continuo = Afinador(3, [0, 1], str(tmp_path / "continuo.json"), semente=7, limite_pecas=15)
+    continuo.executar(2, processos=1)
+
+    interrompido = Afinador(3, [0, 1], str(tmp_path / "interrompido.json"), semente=7, limite_pecas=15)
+    interrompido.executar(1, processos=1)
+    retomado = Afinador.carregarCheckpoint(str(tmp_path / "interrompido.json"))
+    assert retomado.geracao == interrompido.geracao == 1
+    assert retomado.individuos == interrompido.individuos
+    assert retomado.melhor_pesos == interrompido.melhor_pesos
+    assert retomado.melhor_aptidao == interrompido.melhor_aptidao
+    assert retomado.gerador.getstate() == interrompido.gerador.getstate()
+
+    retomado.executar(2, processos=1)
+    assert retomado.individuos == continuo.individuos
+    assert retomado.melhor_pesos == continuo.melhor_pesos
+    assert retomado.historico == continuo.historico
+
+### Testes de importação ###
+
+def test_importar_jogo_sem_readchar():
+    programa = "import sys, Jogo; print('readchar' in sys.modules)"
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    saida = subprocess.run([sys.executable, "-c", programa], cwd=diretorio, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "False"
+
+### Testes de Eventos ###
+
+def test_fluxo_eventos_ate_fixar_peca():
+    partida = Partida(20, 10, "Jogador", None, None, semente=2)
+    tipos = [evento['tipo'] for evento in fluxoEventos(partida, [BAIXO] * 40)]
+    assert tipos[0] == 'nova_peca'
+    assert 'movimento' in tipos
+    assert tipos[tipos.index('fixacao') + 1] == 'nova_peca'
+    assert partida.observadores == []
+
+def test_gravador_jsonl_escreve_em_lotes(tmp_path):
+    caminho = tmp_path / "eventos.jsonl"
+    partida = Partida(20, 10, "Jogador", None, None, semente=2)
+    with GravadorJSONL(caminho, tamanho_lote=4) as gravador:
+        partida.observadores.append(gravador)
+        partida.posicionarPecaAtual()
+        for _ in range(5):
+            partida.aplicarComando(BAIXO)
+        assert len(gravador.lote) < 4
+    eventos = [json.loads(linha) for linha in caminho.read_text().splitlines()]
+    assert [evento['sequencia'] for evento in eventos] == list(range(1, 7))
+
+def test_gravador_csv(tmp_path):
+    caminho = tmp_path / "eventos.csv"
+    partida = Partida(20, 10, "Jogador", None, None, semente=2)
+    with GravadorCSV(caminho) as gravador:
+        partida.observadores.append(gravador)
+        partida.posicionarPecaAtual()
+    with open(caminho, newline='') as f:
+        linhas = list(csv.reader(f))
+    assert tuple(linhas[0]) == CAMPOS_EVENTO
+    assert linhas[1][2] == 'nova_peca'
+
+### Testes do Salvamento Automático ###
+
+def ler_salvamento(caminho):
+    with open(caminho) as f:
+        cabecalho = [f.readline().strip() for _ in range(4)]
+        grade = [list(linha.rstrip("\n")) for linha in f]
+    return grade, aplicarDeltas(str(caminho), grade, int(cabecalho[3]))
+
+def test_autosalvamento_grava_deltas_e_retoma(tmp_path):
+    caminho = tmp_path / "autosave.txt"
+    partida = Partida(20, 10, "Jogador", None, None, semente=4)
+    partida.posicionarPecaAtual()
+    salvamento = AutoSalvamento(str(caminho), intervalo=0)
+    salvamento.registrar(partida)
+    salvamento.aguardar()
+    partida.grade[19][0] = '#'
+    partida.pontuacao = 300
+    salvamento.registrar(partida)
+    salvamento.encerrar()
+
+    delta = (tmp_path / "autosave.txt.delta").read_text()
+    assert delta == f"@{etiqueta(caminho.read_text())}\n#300\n19:#         \n.\n"
+    # Delta incompleto (queda no meio da escrita) é ignorado, mesmo cortado no meio de uma linha
+    for incompleto in ["#900\n18:##########\n", "#900\n18:###", "#400\n1", "#"]:
+        (tmp_path / "autosave.txt.delta").write_text(delta + incompleto)
+        grade, pontuacao = ler_salvamento(caminho)
+        assert pontuacao == 300
+        assert grade[19] == ['#'] + [' '] * 9
+        assert all(c == ' ' for linha in grade[:19] for c in linha)  # a peça em jogo não é salva
+
+def test_autosalvamento_ignora_deltas_de_outro_arquivo_principal(tmp_path):
+    caminho = tmp_path / "autosave.txt"
+    partida = Partida(20, 10, "Jogador", None, None, semente=4)
+    salvamento = AutoSalvamento(str(caminho), intervalo=0)
+    salvamento.registrar(partida)
+    salvamento.aguardar()
+    partida.grade[19][0] = '#'
+    partida.pontuacao = 300
+    salvamento.registrar(partida)
+    salvamento.encerrar()
+    # Queda entre a renomeação do arquivo principal e o recomeço do registro de deltas
+    caminho.write_text(caminho.read_text().replace("\n0\n", "\n500\n", 1))
+    grade, pontuacao = ler_salvamento(caminho)
+    assert pontuacao == 500
+    assert all(c == ' ' for c in grade[19])
+
+def test_autosalvamento_compacta(tmp_path):
+    caminho = tmp_path / "autosave.txt"
+    partida = Partida(20, 10, "Jogador", None, None, semente=4)
+    salvamento = AutoSalvamento(str(caminho), intervalo=0, compactar_a_cada=1)
+    for coluna in range(4):
+        partida.grade[19][coluna] = '#'
+        salvamento.registrar(partida)
+        salvamento.aguardar()
+    salvamento.encerrar()
+    # compactação, delta, compactação, delta
+    delta = (tmp_path / "autosave.txt.delta").read_text()
+    assert delta.split("\n", 1)[1] == "#0\n19:####      \n.\n"
+    grade, _ = ler_salvamento(caminho)
+    assert grade[19][:4] == ['#', '#', '#', '#']
+
+def test_partida_interrompida_mantem_autosalvamento(tmp_path, monkeypatch):
+    monkeypatch.setattr(Tela, "limpar_tela", lambda: None)
+    monkeypatch.setattr(Tela, "exibir", lambda grade, pontuacao: None)
+    caminho = tmp_path / "autosave.txt"
+    partida = Partida(20, 10, "Jogador", None, None, semente=4)
+    salvamento = AutoSalvamento(str(caminho), intervalo=0)
+    with pytest.raises(KeyboardInterrupt):
+        partida.jogar(fps_maximo=1000, teclado=TecladoInterrompido([['b', 'b']]), autosalvamento=salvamento)
+    assert caminho.exists()
+    grade, _ = ler_salvamento(caminho)
+    assert len(grade) == 20
+
+### Testes do Mural ###
+
+def test_mural_reescreve_apenas_linhas_alteradas():
+    partidas = [Partida(20, 10, f"bot{i}", None, None, semente=i) for i in range(4)]
+    for partida in partidas:
+        partida.posicionarPecaAtual()
+    saida = io.StringIO()
+    mural = Mural(por_linha=2, largura=10, altura=20, saida=saida)
+    assert mural.desenhar(partidas) == 4 * 23
+    assert mural.desenhar(partidas) == 0
+    partidas[0].grade[19][0] = '#'
+    assert mural.desenhar(partidas) == 1
+
+def test_mural_reduz_grade_grande():
+    partida = Partida(40, 20, "bot", None, None)
+    partida.grade[39][19] = '#'
+    ladrilho = Mural(largura=10, altura=20, modo=REDUZIR).ladrilho(partida)
+    assert len(ladrilho) == 23
+    assert ladrilho[-2] == "|         #|"
+
+def test_mural_acompanhar_termina_com_parar():
+    partida = Partida(20, 10, "bot", None, None, semente=1)
+    partida.posicionarPecaAtual()
+    parar = threading.Event()
+    parar.set()
+    saida = io.StringIO()
+    Mural(saida=saida).acompanhar([partida], fps=1, parar=parar)
+    assert partida.jogo_ativo
+    assert saida.getvalue()  # o mural é desenhado uma última vez
+
+def test_retratista_copia_a_partida_entre_comandos():
+    partida = Partida(20, 10, "bot", None, None, semente=1)
+    retratista = Retratista(partida)
+    partida.posicionarPecaAtual()
+    retrato = retratista.retrato
+    mural = Mural(largura=10, altura=20)
+    ladrilho = mural.ladrilho(retrato)
+    # No meio de um movimento a peça sai da grade, mas o retrato não muda
+    partida.peca_atual.apagaAnterior(partida.grade)
+    assert mural.ladrilho(partida) != ladrilho
+    assert mural.ladrilho(retratista.retrato) == ladrilho
+    partida.peca_atual.posicionarTabuleiro(partida.grade)
+    while partida.aplicarComando(BAIXO) is None:
+        assert retratista.retrato is retrato
+    assert retratista.retrato is not retrato  # nova peça
+
+### Testes do Ranking ###
+
+def test_ranking_consultas(tmp_path):
+    ranking = Ranking(str(tmp_path / "ranking.txt"))
+    for nome, pontuacao in [("ana", 300), ("bia", 500), ("ana", 100), ("caio", 300), ("ana", 700)]:
+        ranking.adicionar(nome, pontuacao)
+    assert ranking.melhor("ana") == 700
+    assert ranking.melhor("ninguem") is None
+    assert ranking.recentes("ana", 2) == [700, 100]
+    assert ranking.posicao(300) == 3
+    assert ranking.posicao(1000) == 1
+    assert ranking.percentil(300) == 60
+    assert ranking.pagina(1, 2) == [(1, "ana", 700), (2, "bia", 500)]
+    assert ranking.pagina(2, 2) == [(3, "ana", 300), (4, "caio", 300)]
+    assert ranking.pagina(3, 2) == [(5, "ana", 100)]
+
+def test_ranking_salva_historico(tmp_path):
+    caminho = str(tmp_path / "ranking.txt")
+    ranking = Ranking(caminho)
+    for i in range(12):
+        ranking.adicionar(f"j{i}", i)
+        ranking.salvar()
+    recarregado = Ranking(caminho)
+    assert recarregado.historico == ranking.historico
+    assert recarregado.pontuacoes[0] == ("j11", 11)
+    assert len(recarregado.pontuacoes) == 12
+
+### Testes do Teste de Carga ###
+
+def test_sessao_reinicia_apos_fim_de_jogo():
+    sessao = Sessao("bot", 1, linhas=6, colunas=10)
+    while not sessao.passo():
+        pass
+    assert sessao.partidas == 1
+    sessao.reiniciar()
+    assert sessao.partida.jogo_ativo
+
+def test_carga_registra_partidas_no_ranking(tmp_path):
+    caminho = tmp_path / "ranking.txt"
+    resultado = Carga(sessoes=20, trabalhadores=2, teclas_por_segundo=200, duracao=0.5, automatico=False,
+                      linhas=5, colunas=10, caminho_ranking=str(caminho)).executar()
+    assert resultado["passos"] > 0
+    assert resultado["gravacoes_ranking"] > 0
+    assert len(caminho.read_text().splitlines()) == resultado["gravacoes_ranking"]
+    assert quantil([3, 1, 2], 50) == 2
+
+def test_sessao_termina_no_limite_de_pecas():
+    sessao = Sessao("bot", 1, autojogador=AutoJogador(), limite_pecas=2)
+    primeira = sessao.partida.peca_atual
+    while not sessao.passo():
+        pass
+    assert sessao.pecas == 2
+    assert sessao.partida.jogo_ativo
+    assert sessao.partida.peca_atual is not primeira
+
+def test_carga_automatica_grava_no_ranking(tmp_path):
+    resultado = Carga(sessoes=4, trabalhadores=2, teclas_por_segundo=400, duracao=0.5, limite_pecas=1,
+                      caminho_ranking=str(tmp_path / "ranking.txt")).executar()
+    assert resultado["gravacoes_ranking"] > 0
+    assert resultado["escolha_p99"] > resultado["latencia_p50"]
+
+### Testes do Cache de Jogadas ###
+
+def test_cache_jogadas_reproduz_partida(tmp_path):
+    caminho = str(tmp_path / "jogadas.sqlite")
+    esperada = jogarPartida(PESOS_PADRAO, 3, limite_pecas=60)
+    with CacheJogadas(caminho) as cache:
+        assert jogarPartida(PESOS_PADRAO, 3, limite_pecas=60, cache=cache) == esperada
+    with CacheJogadas(caminho) as cache:
+        assert jogarPartida(PESOS_PADRAO, 3, limite_pecas=60, cache=cache) == esperada
+        assert cache.consultas > 0 and cache.acertos == cache.consultas
+        entradas, consultas, acertos, _ = cache.estatisticas()
+    assert consultas == 2 * acertos
+
+def test_assinatura_ignora_linhas_cobertas():
+    partidas = [Partida(20, 10, "bot", None, None, semente=1, compacta=True) for _ in range(2)]
+    for partida in partidas:
+        partida.grade[19][:] = bytes([1] * 9 + [0])
+        partida.posicionarPecaAtual()
+    partidas[1].grade[19][9] = 1
+    partidas[1].grade[18][9] = 1
+    assert assinatura(partidas[0], PESOS_PADRAO) != assinatura(partidas[1], PESOS_PADRAO)
+    partidas[0].grade[18][:] = bytes([1] * 10)
+    partidas[0].grade[19][9] = 1
+    partidas[0].grade[19][0] = 0
+    partidas[1].grade[18][:] = bytes([1] * 10)
+    assert assinatura(partidas[0], PESOS_PADRAO) == assinatura(partidas[1], PESOS_PADRAO)
+    assert assinatura(partidas[0], PESOS_PADRAO) != assinatura(partidas[0], (1, 0, 0, 0))
+
+def test_cache_jogadas_remove_menos_usadas(tmp_path):
+    with CacheJogadas(str(tmp_path / "jogadas.sqlite"), capacidade=2, tamanho_lote=1) as cache:
+        cache.guardar(b"a", ["baixo"])
+        cache.guardar(b"b", [])
+        assert cache.obter(b"a") == ["baixo"]
+        cache.descarregar()
+        cache.guardar(b"c", ["direita"])
+        assert cache.obter(b"b") is None
+        assert cache.obter(b"a") == ["baixo"]
+        assert cache.obter(b"c") == ["direita"]
+
+def test_cache_jogadas_limita_memoria(tmp_path):
+    with CacheJogadas(str(tmp_path / "jogadas.sqlite"), capacidade=3, tamanho_lote=1000) as cache:
+        for i in range(10):
+            cache.guardar(bytes([i]), ["baixo"])
+            assert cache.obter(bytes([0])) == ["baixo"]  # a mais usada continua na memória
+        assert len(cache._memoria) == 3
+        assert bytes([0]) in cache._memoria
+
+### Testes Diferenciais ###
+
+def motor_gira_sempre_horario(linhas, colunas, semente):
+    partida = motorReferencia(linhas, colunas, semente)
+    aplicar = partida.aplicarComando
+    partida.aplicarComando = lambda comando: aplicar(GIRAR_HORARIO if comando == GIRAR_ANTI_HORARIO else comando)
+    return partida
+
+def test_comparar_motores_concordam():
+    for semente in range(20):
+        assert comparar(gerarCaso(semente, 100)) is None
+
+def test_reduzir_divergencia(tmp_path):
+    motores = {'horario': motor_gira_sempre_horario}
+    caso = next(caso for caso in map(gerarCaso, range(100)) if comparar(caso, motores) is not None)
+    divergencia = comparar(caso, motores)
+    assert divergencia["motor"] == 'horario'
+    reduzido = reduzir(caso, 'horario', motores)
+    assert comparar(reduzido, motores) is not None
+    assert len(reduzido["comandos"]) <= divergencia["passo"]
+    assert GIRAR_ANTI_HORARIO in reduzido["comandos"]
+    caminho = str(tmp_path / "regressoes.json")
+    salvarRegressao(caminho, reduzido, 'horario')
+    assert carregarRegressoes(caminho) == [dict(reduzido, motor='horario')]
+
+def test_regressoes_diferenciais():
+    for caso in carregarRegressoes():
+        assert comparar(caso) is None
+
+### Testes da Observação ###
+
+@pytest.mark.parametrize("compacta", [False, True])
+def test_observacao_acompanha_partida(compacta):
+    partida = Partida(20, 10, "bot", None, None, semente=2, compacta=compacta)
+    observacao = partida.observacao()
+    assert partida.observacao() is observacao
+    assert observacao.tabuleiro.shape == (20, 10) and observacao.tabuleiro.strides == (10, 1)
+    conferidos = []
+
+    def conferir(evento):
+        if evento['tipo'] in ('fixacao', 'linhas_removidas'):
+            return
+        assert bytes(observacao.celulas) == b"".join(linhaCompacta(textoLinha(linha)) for linha in partida.grade)
+        peca = partida.peca_atual
+        assert list(observacao.estado) == [peca.codigo, peca.rotacao, peca.x, peca.y,
+                                           partida.pontuacao, partida.jogo_ativo]
+        conferidos.append(evento['tipo'])
+
+    partida.observadores.append(conferir)
+    assert AutoJogador().jogar(partida, 60) > 0
+    assert 'pontuacao' in conferidos
+    assert observacao.comoDicionario()['pontuacao'] == partida.pontuacao
+    assert len(CAMPOS_OBSERVACAO) == len(observacao.estado)